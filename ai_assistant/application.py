@@ -1,6 +1,7 @@
 import sys
 import os
 import asyncio
+from typing import Optional
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import QTimer
 from config.settings import AppConfig
@@ -12,8 +13,9 @@ from modules.audio import create_audio_provider
 from modules.speech import create_speech_provider
 from modules.assistant import create_assistant_provider
 from modules.clipboard import create_clipboard_provider
+from modules.tts import create_tts_provider
 from core.interfaces.audio import AudioInputProvider
-from core.interfaces.speech import SpeechToTextProvider
+from core.interfaces.speech import SpeechToTextProvider, TextToSpeechProvider
 from core.interfaces.assistant import AssistantProvider
 from core.interfaces.clipboard import ClipboardProvider
 from qasync import QEventLoop  # Add this import
@@ -37,6 +39,7 @@ class Application:
             f"Loading config from: {os.path.abspath(self.CONFIG_PATH)}"
         )  # Debug print
         self.config = AppConfig.load(self.CONFIG_PATH)
+        self._warm_up_task: Optional[asyncio.Task] = None
         self._setup_event_handling()
 
     def _setup_event_handling(self):
@@ -83,6 +86,15 @@ class Application:
                 SpeechToTextProvider, speech_provider, speech_config
             )
 
+            # Text-to-speech provider
+            if self.config.tts is not None:
+                tts_provider = create_tts_provider(
+                    self.config.tts.provider_type, self.config.tts.config
+                )
+                self.registry.register_provider(
+                    TextToSpeechProvider, tts_provider, self.config.tts.config
+                )
+
             # Assistant provider
             assistant_provider = create_assistant_provider(
                 self.config.assistant.provider_type
@@ -106,6 +118,27 @@ class Application:
             )
             raise
 
+    def _start_warm_up(self):
+        speech_provider = self.registry.get_provider(SpeechToTextProvider)
+        self._warm_up_task = self.loop.create_task(speech_provider.warm_up())
+        self._warm_up_task.add_done_callback(self._on_warm_up_done)
+
+    def _on_warm_up_done(self, task: asyncio.Task):
+        # Retrieve the outcome so a failure is reported now, not at exit
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            print(f"Speech model warm-up failed: {error}", file=sys.stderr)
+
+    def _shutdown(self):
+        """Stop background speech work before the event loop goes away"""
+        if self._warm_up_task is not None and not self._warm_up_task.done():
+            self._warm_up_task.cancel()
+        speech_provider = self.registry.get_provider(SpeechToTextProvider)
+        if hasattr(speech_provider, "close"):
+            speech_provider.close()
+
     def _setup_style(self):
         """Apply application styling"""
         theme = AppTheme(dark_mode=True)  # TODO: Get from config
@@ -122,6 +155,10 @@ class Application:
             self.main_window = ChatWindow()
             self.main_window.show()
 
+            # Load speech models once the window is up instead of before it
+            self.loop.call_soon(self._start_warm_up)
+            self.app.aboutToQuit.connect(self._shutdown)
+
             # Start the event loop
             return self.loop.run_forever()
 
@@ -28,6 +28,7 @@ class AppConfig:
     clipboard: ModuleConfig
     ui: Dict[str, Any]
     assistants: List[AssistantConfig]
+    tts: Optional[ModuleConfig] = None
 
     @classmethod
     def load(cls, config_path: str) -> "AppConfig":
@@ -49,12 +50,25 @@ class AppConfig:
 
                     # Get the speech config
                     speech_config = speech_dict.get("config", {})
-                    if speech_provider:
+                    # A hedged provider needs every backend's section, so it
+                    # keeps the whole mapping
+                    if speech_provider and speech_provider != "hedged":
                         speech_config = speech_dict.get("config", {}).get(
                             speech_provider, {}
                         )
                     print(f"Speech config: {speech_config}")
 
+                    # Speak replies only when the config has an enabled tts
+                    # section; older configs without one stay silent
+                    tts = None
+                    tts_dict = config_dict.get("tts") or {}
+                    if tts_dict and tts_dict.get("enabled", True):
+                        tts_provider = tts_dict.get("provider") or "pyttsx3"
+                        tts = ModuleConfig(
+                            provider_type=tts_provider,
+                            config=(tts_dict.get("config") or {}).get(tts_provider, {}),
+                        )
+
                     # Get audio settings
                     audio_dict = config_dict.get("audio", {})
                     audio_config = audio_dict.get("config", {})
@@ -92,6 +106,7 @@ class AppConfig:
                         ),
                         ui=config_dict.get("ui", {}),
                         assistants=assistants,
+                        tts=tts,
                     )
                     print(
                         f"Created config object with speech provider: {config.speech.provider_type}"
@@ -147,6 +162,7 @@ class AppConfig:
                     "chunk_size": 1024,
                     "input_device": None,  # Will be set to system default
                     "output_device": None,  # Will be set to system default
+                    "recording_format": "wav",  # "wav" or "flac"
                 },
             ),
             speech=ModuleConfig(
@@ -154,12 +170,41 @@ class AppConfig:
                 config={
                     "whisper": {
                         "model": "base",
+                        "workers": 1,  # Inference processes, each with a model copy
+                        "backend": "float32",  # "int8" for quantized CPU inference
+                        "threads": None,  # Torch threads per worker
+                        "beam_size": None,  # None for greedy decoding
+                        "temperature": [0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
+                        "vad": {"enabled": False},
+                        # Sliding-window decoding: seconds of new audio per
+                        # decode, and the longest uncommitted window allowed
+                        "streaming": {"step": 1.0, "max_window": 15.0},
+                        # Speech segments decoded per forward pass when
+                        # transcribing whole files
+                        "batch_size": 8,
+                    },
+                    # Used when provider_type is "hedged": backends in order
+                    # of preference; the next one starts if the current
+                    # ones have nothing acceptable after launch_delay s
+                    "hedged": {
+                        "backends": ["whisper", "deepgram"],
+                        "launch_delay": 0.5,
+                        "min_chars": 2,
                     },
                     "deepgram": {
+                        # "live" streams over one WebSocket session;
+                        # "windowed" uploads 0.5 s windows as REST requests
+                        "mode": "live",
+                        "keepalive_interval": 5.0,
+                        "max_in_flight": 4,  # Concurrent windowed requests
+                        # Prerecorded uploads: "flac" (lossless), "opus" or
+                        # "wav"; payloads under min_bytes are sent as WAV
+                        "upload": {"codec": "flac", "min_bytes": 65536},
                         "model": "nova-2",
                         "language": "en",
                         "smart_format": True,
                         "encoding": "linear16",
+                        "vad": {"enabled": False},
                     },
                 },
             ),
@@ -167,6 +212,14 @@ class AppConfig:
             clipboard=ModuleConfig(provider_type="qt", config={}),
             ui={"theme": "dark", "window_size": [800, 600]},
             assistants=[],  # Will be populated from va-*.yaml files
+            tts=ModuleConfig(
+                provider_type="pyttsx3",
+                config={
+                    "voice": None,  # Engine default voice
+                    "rate": None,  # Words per minute, engine default
+                    "sample_rate": 22050,
+                },
+            ),
         )
 
     def save(self, config_path: str) -> None:
@@ -190,6 +243,12 @@ class AppConfig:
             },
             "ui": self.ui,
         }
+        if self.tts is not None:
+            # Written keyed by provider, the same layout load() reads
+            config_dict["tts"] = {
+                "provider": self.tts.provider_type,
+                "config": {self.tts.provider_type: self.tts.config},
+            }
 
         os.makedirs(os.path.dirname(config_path), exist_ok=True)
         with open(config_path, "w") as f:
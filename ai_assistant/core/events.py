@@ -10,6 +10,7 @@ class EventType(Enum):
     TRANSCRIPTION_STARTED = auto()
     TRANSCRIPTION_STOPPED = auto()
     TRANSCRIPTION_RESULT = auto()
+    SPEECH_MODEL_READY = auto()
     ASSISTANT_RESPONSE_STARTED = auto()
     ASSISTANT_RESPONSE_CHUNK = auto()
     ASSISTANT_RESPONSE_FINISHED = auto()
@@ -53,7 +54,10 @@ class EventBus:
             self._subscribers[event_type].remove(callback)
 
     async def emit(self, event: Event) -> None:
-        await self._queue.put(event)
+        # Transcripts arrive many times a second and go to subscribers only,
+        # so they can't crowd other events out of get_event()
+        if event.type != EventType.TRANSCRIPTION_RESULT:
+            await self._queue.put(event)
         if event.type in self._subscribers:
             for callback in self._subscribers[event.type]:
                 try:
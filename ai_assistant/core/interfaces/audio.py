@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
 from typing import Optional, BinaryIO
 from dataclasses import dataclass
 
@@ -9,6 +10,8 @@ class AudioConfig:
     channels: int
     chunk_size: int
     device_id: Optional[int] = None
+    recording_path: Optional[str] = None  # Stream captured audio to this file
+    sample_format: str = "int16"  # PCM format of the chunks a provider returns
 
 
 class AudioInputProvider(ABC):
@@ -22,6 +25,11 @@ class AudioInputProvider(ABC):
         """Read a chunk of audio data"""
         pass
 
+    @abstractmethod
+    def read_available(self) -> bytes:
+        """Read all buffered audio data without blocking"""
+        pass
+
     @abstractmethod
     def stop_stream(self) -> None:
         """Stop audio input stream"""
@@ -35,8 +43,12 @@ class AudioInputProvider(ABC):
 
 class AudioOutputProvider(ABC):
     @abstractmethod
-    def play_audio(self, audio_data: BinaryIO) -> None:
-        """Play audio from data"""
+    def play_audio(self, audio_data: BinaryIO) -> Future:
+        """Start playing audio without blocking.
+
+        Returns a Future that resolves when playback finishes and is cancelled
+        if stop_playback() interrupts it.
+        """
         pass
 
     @abstractmethod
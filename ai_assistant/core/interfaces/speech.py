@@ -1,8 +1,24 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from typing import AsyncIterator
+from core.interfaces.audio import AudioConfig
+from core.events import EventBus, Event, EventType
+
+
+@dataclass
+class TranscriptHypothesis:
+    text: str
+    is_final: bool  # Final text never changes; partial text may be revised
+    start: float = 0.0  # Seconds from the start of the stream
+    end: float = 0.0
+    stability: float = 1.0  # Share of the words already seen in the last partial
+    segment_id: int = 0  # Shared by a segment's partials and its final
 
 
 class SpeechToTextProvider(ABC):
+    # Cleared when another provider (e.g. a hedged composite) owns the results
+    publish_events = True
+
     @abstractmethod
     async def transcribe_stream(
         self, audio_stream: AsyncIterator[bytes]
@@ -15,9 +31,54 @@ class SpeechToTextProvider(ABC):
         """Convert audio file to text"""
         pass
 
+    async def stream_hypotheses(
+        self, audio_stream: AsyncIterator[bytes]
+    ) -> AsyncIterator[TranscriptHypothesis]:
+        """Convert streaming audio to partial and final hypotheses.
+
+        Each hypothesis is also published as a TRANSCRIPTION_RESULT event.
+        Providers without partial results yield finals only.
+        """
+        segment_id = 0
+        async for text in self.transcribe_stream(audio_stream):
+            hypothesis = TranscriptHypothesis(text, True, segment_id=segment_id)
+            segment_id += 1
+            if self.publish_events:
+                await EventBus.get_instance().emit(
+                    Event(EventType.TRANSCRIPTION_RESULT, data=hypothesis)
+                )
+            yield hypothesis
+
+    def set_input_format(self, sample_rate: int, sample_format: str) -> None:
+        """Describe the PCM chunks that will be passed to transcribe_stream"""
+        pass
+
+    async def warm_up(self) -> None:
+        """Load models ahead of the first request; emits SPEECH_MODEL_READY"""
+        if self.publish_events:
+            await EventBus.get_instance().emit(
+                Event(
+                    EventType.SPEECH_MODEL_READY,
+                    data={"provider": type(self).__name__, "model": None},
+                )
+            )
+
 
 class TextToSpeechProvider(ABC):
     @abstractmethod
     async def synthesize(self, text: str) -> bytes:
-        """Convert text to speech"""
+        """Convert text to speech, returning a WAV file as bytes"""
+        pass
+
+    @abstractmethod
+    async def synthesize_stream(self, text: str) -> AsyncIterator[bytes]:
+        """Convert text to speech, yielding PCM blocks as they are produced.
+
+        Blocks are in the format described by get_output_config().
+        """
+        pass
+
+    @abstractmethod
+    def get_output_config(self) -> AudioConfig:
+        """Sample rate, channels and sample format of synthesize_stream() blocks"""
         pass
@@ -0,0 +1,212 @@
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Tuple
+import pyaudio
+
+
+@dataclass
+class _PlaybackItem:
+    buffers: deque  # PCM buffers (bytes-like) ready to play
+    future: Future
+    offset: int = 0  # Bytes already consumed from buffers[0]
+    exhausted: bool = True  # False while a feeder thread is still reading
+    space: Optional[threading.Condition] = None  # Signalled as buffers drain
+
+
+class PlaybackEngine:
+    """Asynchronous PyAudio playback through one warm output stream.
+
+    PCM buffers are queued with play(), which returns immediately with a
+    Future that resolves once the clip has been handed to PortAudio. The
+    stream callback pulls from the queue and writes silence when it runs dry,
+    so the stream stays open between clips and the next clip starts within one
+    buffer period. The stream is only reopened when the device or PCM format
+    changes, and is paused after `idle_timeout` seconds of silence.
+
+    Buffers may come from a lazy iterator (e.g. blocks read from a file). Only
+    `prefetch` of them are held at a time; a feeder thread reads the rest as
+    playback drains them, so long clips never sit in memory whole and the
+    callback never does I/O.
+    """
+
+    def __init__(
+        self,
+        audio: pyaudio.PyAudio,
+        frames_per_buffer: int = 512,
+        idle_timeout: float = 5.0,
+        prefetch: int = 4,
+    ):
+        self._audio = audio
+        self._frames_per_buffer = frames_per_buffer
+        self._idle_timeout = idle_timeout
+        self._prefetch = prefetch
+        self._lock = threading.Lock()
+        self._queue: deque = deque()
+        self._stream = None
+        self._stream_key: Optional[Tuple] = None
+        self._frame_bytes = 0
+        self._last_audio = 0.0
+
+    def play(
+        self,
+        buffers: Iterable,
+        sample_rate: int,
+        channels: int = 1,
+        sample_width: int = 2,
+        device_id: Optional[int] = None,
+    ) -> Future:
+        """Queue PCM buffers for playback and return a completion Future"""
+        future: Future = Future()
+        item = _PlaybackItem(deque(), future, space=threading.Condition())
+        source = iter(buffers)
+        item.exhausted = not self._fill(item, source)
+        if item.exhausted and not item.buffers:
+            future.set_result(None)
+            return future
+
+        with self._lock:
+            key = (device_id, sample_rate, channels, sample_width)
+            if key != self._stream_key:
+                # A different device/format needs its own stream
+                self._cancel_queued()
+                self._open_stream(key)
+            self._queue.append(item)
+            self._last_audio = time.monotonic()
+            if not self._stream.is_active():
+                self._stream.stop_stream()  # Clear a paComplete from idling
+                self._stream.start_stream()
+        if not item.exhausted:
+            threading.Thread(
+                target=self._feed, args=(item, source), daemon=True
+            ).start()
+        return future
+
+    def _fill(self, item: _PlaybackItem, source: Iterator) -> bool:
+        """Read buffers until `prefetch` are queued; False once source ends"""
+        while len(item.buffers) < self._prefetch:
+            buffer = next(source, None)
+            if buffer is None:
+                return False
+            if len(buffer):
+                item.buffers.append(memoryview(buffer).cast("B"))
+        return True
+
+    def _feed(self, item: _PlaybackItem, source: Iterator) -> None:
+        """Keep an item's queue topped up from its source until it ends"""
+        try:
+            while not item.future.done():
+                with item.space:
+                    while (
+                        len(item.buffers) >= self._prefetch and not item.future.done()
+                    ):
+                        item.space.wait(0.1)
+                if item.future.done() or not self._fill(item, source):
+                    break
+        except Exception as e:
+            print(f"!!! Error reading playback buffers: {e}")
+            print(traceback.format_exc())
+        finally:
+            item.exhausted = True
+            if hasattr(source, "close"):
+                source.close()  # Release a file held open by a generator
+
+    def stop(self) -> None:
+        """Drop everything queued; playback goes silent on the next buffer"""
+        with self._lock:
+            self._cancel_queued()
+
+    def is_playing(self) -> bool:
+        return bool(self._queue)
+
+    def close(self) -> None:
+        with self._lock:
+            self._cancel_queued()
+            self._close_stream()
+
+    def _open_stream(self, key: Tuple) -> None:
+        self._close_stream()
+        device_id, sample_rate, channels, sample_width = key
+        print(
+            f">>> Opening playback stream: device={device_id} {sample_rate}Hz "
+            f"{channels}ch {sample_width * 8}-bit"
+        )
+        self._frame_bytes = channels * sample_width
+        self._stream = self._audio.open(
+            format=self._audio.get_format_from_width(sample_width),
+            channels=channels,
+            rate=sample_rate,
+            output=True,
+            output_device_index=device_id,
+            frames_per_buffer=self._frames_per_buffer,
+            stream_callback=self._callback,
+            start=False,
+        )
+        self._stream_key = key
+
+    def _close_stream(self) -> None:
+        if self._stream is None:
+            return
+        try:
+            if self._stream.is_active():
+                self._stream.stop_stream()
+            self._stream.close()
+        except Exception as e:
+            print(f"!!! Error closing playback stream: {e}")
+        finally:
+            self._stream = None
+            self._stream_key = None
+
+    def _cancel_queued(self) -> None:
+        while self._queue:
+            item = self._queue.popleft()
+            item.future.cancel()
+
+    def _callback(self, in_data, frame_count, time_info, status_flags):
+        """PortAudio callback: fill the output buffer from the queue"""
+        needed = frame_count * self._frame_bytes
+        out = bytearray(needed)  # Zero-filled, so any gap plays as silence
+        filled = 0
+        try:
+            while filled < needed and self._queue:
+                item = self._queue[0]
+                if item.future.done():  # Cancelled by the caller
+                    self._queue.popleft()
+                    continue
+                if not item.buffers:
+                    if not item.exhausted:
+                        break  # The feeder is behind; pad with silence
+                    self._queue.popleft()
+                    item.future.set_result(None)
+                    continue
+                data = item.buffers[0]
+                count = min(needed - filled, len(data) - item.offset)
+                out[filled : filled + count] = data[item.offset : item.offset + count]
+                filled += count
+                item.offset += count
+                if item.offset >= len(data):
+                    item.buffers.popleft()
+                    item.offset = 0
+                    if not item.exhausted:
+                        with item.space:
+                            item.space.notify()
+                        continue
+                    if not item.buffers:
+                        self._queue.popleft()
+                        if not item.future.done():
+                            item.future.set_result(None)
+        except (IndexError, InvalidStateError):
+            pass  # stop() emptied the queue while we were reading it
+        except Exception as e:
+            print(f"!!! Error in playback callback: {e}")
+            print(traceback.format_exc())
+
+        now = time.monotonic()
+        if filled:
+            self._last_audio = now
+        elif now - self._last_audio > self._idle_timeout:
+            return (bytes(out), pyaudio.paComplete)
+        return (bytes(out), pyaudio.paContinue)
@@ -1,25 +1,51 @@
 import pyaudio
 import wave
+import dataclasses
 from typing import Optional, BinaryIO
 from core.interfaces.audio import AudioInputProvider, AudioOutputProvider, AudioConfig
 import io
 import struct
 import traceback  # Add this import
 import numpy as np
+import os
+import soundfile as sf
 import time
+from concurrent.futures import Future
+from utils.ring_buffer import BroadcastRingBuffer, OverflowPolicy, RingSubscription
+from utils.sample_store import SampleStore
+from utils.level_meter import LevelMeter, LevelSnapshot
+from utils.device_cache import DeviceCapabilityCache, PROBE_RATES, supports
+from .playback_engine import PlaybackEngine
+from .recording_writer import StreamingRecordingWriter
 
 
 class PyAudioProvider(AudioInputProvider, AudioOutputProvider):
     def __init__(self):
         self._audio = pyaudio.PyAudio()
         self._stream = None
-        self._playback_stream = None
+        self._playback = PlaybackEngine(self._audio)
         self._config = None
-        self._recorded_frames = []
+        self._stream_config: Optional[AudioConfig] = None
+        self._recording = SampleStore(dtype=np.int16)
+        self._writer = StreamingRecordingWriter()
         self._output_device_id = None
         self._is_processing = False
         self._stop_requested = False  # Add flag for graceful shutdown
         self._min_recording_length = 2.0
+        self._chunk = 2048
+        self._preferred_rate = 16000
+        self._pa_formats = {"int16": pyaudio.paInt16, "float32": pyaudio.paFloat32}
+        self._ring_chunks = 32  # Capture buffer size as a multiple of chunk size
+        # One capture source shared by every consumer (STT, meter, VAD...)
+        self._ring = BroadcastRingBuffer(self._chunk * self._ring_chunks, np.int16)
+        self._primary = self._ring.subscribe("primary")
+        self._levels = LevelMeter(sample_rate=44100)
+        self._gain = 5
+        self._callback_count = 0
+        # Device capabilities are cached on disk and enumerated once per session
+        self._device_cache = DeviceCapabilityCache()
+        self._capabilities: Optional[dict] = None
+        self._device_list: Optional[dict] = None
         print(">>> PyAudio initialized")
 
     def is_processing(self) -> bool:
@@ -36,35 +62,58 @@ class PyAudioProvider(AudioInputProvider, AudioOutputProvider):
 
             # Get device info
             device_info = self._audio.get_device_info_by_index(config.device_id)
-            sample_format = pyaudio.paInt16
-            channels = 1
-            fs = int(device_info["defaultSampleRate"])
-            # Increase chunk size for more stable recording
-            chunk = 2048  # Doubled from 1024
+            stream_config = self.negotiate_format(config)
+            device_format = self._pa_formats[stream_config.sample_format]
+            sample_format = pyaudio.paInt16  # Format of everything we store/return
+            channels = stream_config.channels
+            fs = stream_config.sample_rate
+            chunk = stream_config.chunk_size
 
             print(f"Device: {device_info['name']}")
-            print(f"Format: {sample_format}")
+            print(f"Format: {sample_format} (device: {device_format})")
             print(f"Channels: {channels}")
             print(f"Rate: {fs}")
             print(f"Chunk: {chunk}")
             print(f"Min recording length: {self._min_recording_length}s")
 
+            self._config = {
+                "format": sample_format,
+                "device_format": device_format,
+                "channels": channels,
+                "rate": fs,
+                "chunk": chunk,
+            }
+            # Consumers see int16 regardless of what the device delivers
+            self._stream_config = dataclasses.replace(
+                stream_config, sample_format="int16"
+            )
+            self._recording.clear()
+            self._callback_count = 0
+            if config.recording_path:
+                # Persist blocks as they arrive instead of holding the session in RAM
+                self._writer.open(
+                    config.recording_path,
+                    sample_rate=fs,
+                    channels=channels,
+                    sample_width=self._audio.get_sample_size(sample_format),
+                )
+            # Don't hand the previous session's tail to read_chunk()
+            self._primary.skip()
+            self._levels.reset(fs)
+            print(f">>> Capture buffer: {self._ring.capacity} frames")
+
+            # PortAudio drives capture from its own thread through the callback,
+            # so nothing here depends on how often the UI polls read_chunk()
             self._stream = self._audio.open(
-                format=sample_format,
+                format=device_format,
                 channels=channels,
                 rate=fs,
                 frames_per_buffer=chunk,
                 input=True,
                 input_device_index=config.device_id,
+                stream_callback=self._capture_callback,
             )
-
-            self._config = {
-                "format": sample_format,
-                "channels": channels,
-                "rate": fs,
-                "chunk": chunk,
-            }
-            self._recorded_frames = []
+            self._stream.start_stream()
             print(">>> Stream opened successfully")
 
         except Exception as e:
@@ -73,46 +122,109 @@ class PyAudioProvider(AudioInputProvider, AudioOutputProvider):
                 self.stop_stream()
             raise
 
+    def negotiate_format(self, config: AudioConfig) -> AudioConfig:
+        """Choose the capture rate and format for a device.
+
+        Prefers the requested rate (16kHz, what both STT backends want) as
+        int16 and then float32, so nothing downstream has to resample. Falls
+        back to the device default rate when the host API can't deliver it.
+        """
+        device_info = self._audio.get_device_info_by_index(config.device_id)
+        default_rate = int(device_info["defaultSampleRate"])
+        preferred_rate = config.sample_rate or self._preferred_rate
+
+        candidates = [
+            (preferred_rate, "int16"),
+            (preferred_rate, "float32"),
+            (default_rate, "int16"),
+        ]
+        for rate, sample_format in candidates:
+            if self._input_format_supported(config.device_id, rate, sample_format):
+                print(f">>> Negotiated capture format: {rate}Hz {sample_format}")
+                return dataclasses.replace(
+                    config,
+                    sample_rate=rate,
+                    channels=1,
+                    chunk_size=self._chunk,
+                    sample_format=sample_format,
+                )
+
+        print(f"!!! No probed format accepted, using default rate {default_rate}Hz")
+        return dataclasses.replace(
+            config,
+            sample_rate=default_rate,
+            channels=1,
+            chunk_size=self._chunk,
+            sample_format="int16",
+        )
+
+    def get_stream_config(self) -> Optional[AudioConfig]:
+        """Config of the running stream, as delivered by read_chunk()"""
+        return self._stream_config
+
+    def _capture_callback(self, in_data, frame_count, time_info, status_flags):
+        """PortAudio callback: amplify the block and push it into the ring buffer"""
+        if status_flags & pyaudio.paInputOverflow:
+            print("!!! Input overflow reported by PortAudio")
+
+        if self._config["device_format"] == pyaudio.paFloat32:
+            samples = np.frombuffer(in_data, dtype=np.float32) * 32767.0
+        else:
+            samples = np.frombuffer(in_data, dtype=np.int16).astype(np.int32)
+        audio_data = np.clip(samples * self._gain, -32768, 32767).astype(np.int16)
+
+        self._ring.write(audio_data)
+        self._levels.update(audio_data)
+        if self._writer.is_open():
+            self._writer.write(audio_data)
+            recorded = self._writer.frames_written
+        else:
+            self._recording.append(audio_data)
+            recorded = len(self._recording)
+        self._callback_count += 1
+
+        # Log progress periodically
+        if self._callback_count % 100 == 0:
+            duration = recorded / self._config["rate"]
+            max_value = np.max(np.abs(audio_data))
+            print(f">>> Recording duration: {duration:.1f}s (max level: {max_value})")
+
+        return (None, pyaudio.paContinue)
+
+    def subscribe(
+        self, name: str, policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST
+    ) -> RingSubscription:
+        """Get an independent reader over the captured audio.
+
+        Each subscriber sees every captured frame; one that falls behind loses
+        frames according to `policy` without slowing anyone else down.
+        """
+        print(f">>> New capture subscriber: {name} ({policy.value})")
+        return self._ring.subscribe(name, policy)
+
+    def get_levels(self) -> LevelSnapshot:
+        """Current peak/RMS levels and waveform envelope, computed during capture"""
+        return self._levels.snapshot()
+
     def read_chunk(self) -> bytes:
-        """Read a chunk of audio data"""
+        """Read a chunk of audio data from the primary capture subscriber.
+
+        Waits up to two chunk periods for a full chunk and returns whatever is
+        buffered if it doesn't arrive in time.
+        """
         if not self._stream:
             raise RuntimeError("Stream not started")
 
-        try:
-            # Check if stop was requested
-            if self._stop_requested:
-                return b""
-
-            # Read data from stream
-            data = self._stream.read(self._config["chunk"], exception_on_overflow=False)
-            if data:
-                # Convert to numpy array for processing
-                audio_data = np.frombuffer(data, dtype=np.int16)
-
-                # Amplify the audio
-                audio_data = np.clip(audio_data * 5, -32768, 32767).astype(np.int16)
-                amplified_data = audio_data.tobytes()
-
-                # Store the amplified chunk
-                self._recorded_frames.append(amplified_data)
-
-                # Log progress periodically
-                if len(self._recorded_frames) % 100 == 0:
-                    duration = (
-                        len(self._recorded_frames)
-                        * self._config["chunk"]
-                        / self._config["rate"]
-                    )
-                    max_value = np.max(np.abs(audio_data))
-                    print(
-                        f">>> Recording duration: {duration:.1f}s (max level: {max_value})"
-                    )
+        if self._stop_requested:
+            return b""
 
-                return amplified_data
-            return data
-        except Exception as e:
-            print(f"!!! Error reading chunk: {e}")
-            raise
+        chunk = self._config["chunk"]
+        timeout = 2 * chunk / self._config["rate"]
+        return self._primary.read(chunk, timeout=timeout).tobytes()
+
+    def read_available(self) -> bytes:
+        """Return all audio the primary subscriber hasn't read, without blocking"""
+        return self._primary.read_available().tobytes()
 
     def stop_stream(self) -> None:
         """Request to stop the audio stream and wait for processing to complete"""
@@ -125,37 +237,25 @@ class PyAudioProvider(AudioInputProvider, AudioOutputProvider):
             print(">>> Processing remaining audio data...")
 
             if self._stream:
-                # Keep reading remaining data in the stream buffer
-                while (
-                    self._stream.is_active() and self._stream.get_read_available() > 0
-                ):
-                    try:
-                        data = self._stream.read(
-                            self._config["chunk"], exception_on_overflow=False
-                        )
-                        if data:
-                            # Process any remaining audio data
-                            audio_data = np.frombuffer(data, dtype=np.int16)
-                            audio_data = np.clip(audio_data * 5, -32768, 32767).astype(
-                                np.int16
-                            )
-                            self._recorded_frames.append(audio_data.tobytes())
-                        else:
-                            break
-                    except Exception as e:
-                        print(f"!!! Warning: Error reading final chunks: {e}")
-                        break
-
-            # Now we can safely stop and close the stream
-            print(">>> Stopping stream...")
-            self._stream.stop_stream()
-            self._stream.close()
+                # Stopping a callback stream lets PortAudio deliver every pending
+                # buffer to _capture_callback before it returns
+                print(">>> Stopping stream...")
+                self._stream.stop_stream()
+                self._stream.close()
+
+            # Flush and finalize the streamed file, if any
+            if self._writer.is_open():
+                self._writer.close()
+                total_frames = self._writer.frames_written
+            else:
+                total_frames = len(self._recording)
 
             # Calculate final recording length
-            total_samples = len(self._recorded_frames) * self._config["chunk"]
-            recording_length = total_samples / self._config["rate"]
+            recording_length = total_frames / self._config["rate"]
             print(f">>> Final recording length: {recording_length:.2f}s")
-            print(f">>> Total frames recorded: {len(self._recorded_frames)}")
+            print(f">>> Total frames recorded: {total_frames}")
+            if self._primary.dropped:
+                print(f"!!! Primary subscriber dropped {self._primary.dropped} frames")
 
         except Exception as e:
             print(f"!!! Error during stream shutdown: {e}")
@@ -171,87 +271,66 @@ class PyAudioProvider(AudioInputProvider, AudioOutputProvider):
         self._output_device_id = device_id
         print(f">>> Output device ID set to: {device_id}")
 
-    def play_audio(self, audio_data: Optional[BinaryIO] = None) -> None:
-        """Play audio from either a file or recorded frames"""
+    def play_audio(self, audio_data: Optional[BinaryIO] = None) -> Future:
+        """Start playing a WAV file or the last recording.
+
+        Returns as soon as the audio is queued on the warm output stream; the
+        returned Future resolves when playback finishes and is cancelled by
+        stop_playback().
+        """
         print("\n=== Playing audio ===")
 
         try:
-            # Debug output device info
-            if self._output_device_id is not None:
-                try:
-                    device_info = self._audio.get_device_info_by_index(
-                        self._output_device_id
-                    )
-                    print(f">>> Output device info:")
-                    print(f"    Name: {device_info['name']}")
-                    print(
-                        f"    Max Output Channels: {device_info['maxOutputChannels']}"
-                    )
-                    print(
-                        f"    Default Sample Rate: {device_info['defaultSampleRate']}"
-                    )
-                except Exception as e:
-                    print(f"!!! Warning: Could not get complete device info: {e}")
-
-            # Create WAV buffer for either input source
-            wav_buffer = io.BytesIO()
-
             if audio_data is not None:
                 # Using provided audio data (test sound)
                 print(">>> Using provided audio data")
-                wav_buffer.write(audio_data.read())
-                wav_buffer.seek(0)
-            elif self._recorded_frames and self._config:
-                # Using recorded frames
-                print(f">>> Using {len(self._recorded_frames)} recorded frames")
-                with wave.open(wav_buffer, "wb") as wf:
-                    wf.setnchannels(self._config["channels"])
-                    wf.setsampwidth(self._audio.get_sample_size(self._config["format"]))
-                    wf.setframerate(self._config["rate"])
-                    wf.writeframes(b"".join(self._recorded_frames))
-                wav_buffer.seek(0)
-            else:
-                print("!!! No audio data to play")
-                return
-
-            # Play the audio
-            with wave.open(wav_buffer, "rb") as wf:
-                print(f">>> WAV details:")
-                print(f"    Channels: {wf.getnchannels()}")
-                print(f"    Sample width: {wf.getsampwidth()}")
-                print(f"    Frame rate: {wf.getframerate()}")
-                print(f"    Frames: {wf.getnframes()}")
-                duration = wf.getnframes() / wf.getframerate()
+                with wave.open(audio_data, "rb") as wf:
+                    print(f">>> WAV details:")
+                    print(f"    Channels: {wf.getnchannels()}")
+                    print(f"    Sample width: {wf.getsampwidth()}")
+                    print(f"    Frame rate: {wf.getframerate()}")
+                    print(f"    Frames: {wf.getnframes()}")
+                    duration = wf.getnframes() / wf.getframerate()
+                    print(f"    Duration: {duration:.2f}s")
+
+                    return self._playback.play(
+                        [wf.readframes(wf.getnframes())],
+                        wf.getframerate(),
+                        wf.getnchannels(),
+                        wf.getsampwidth(),
+                        self._output_device_id,
+                    )
+            elif len(self._recording) and self._config:
+                # Play straight from the sample store, no WAV round trip
+                duration = len(self._recording) / self._config["rate"]
+                print(f">>> Using {len(self._recording)} recorded frames")
                 print(f"    Duration: {duration:.2f}s")
-
-                # Create playback stream
-                self._playback_stream = self._audio.open(
-                    format=self._audio.get_format_from_width(wf.getsampwidth()),
-                    channels=wf.getnchannels(),
-                    rate=wf.getframerate(),
-                    output=True,
-                    output_device_index=self._output_device_id,
-                    frames_per_buffer=1024,
+                return self._playback.play(
+                    self._recording.views(),
+                    self._config["rate"],
+                    self._config["channels"],
+                    self._audio.get_sample_size(self._config["format"]),
+                    self._output_device_id,
                 )
-
-                # Read and play chunks
-                chunk = 1024
-                data = wf.readframes(chunk)
-                total_bytes = 0
-
-                print(">>> Starting playback...")
-                while len(data) > 0:
-                    self._playback_stream.write(data, chunk)  # Specify chunk size
-                    total_bytes += len(data)
-                    data = wf.readframes(chunk)
-
-                # Wait for stream to finish playing
-                self._playback_stream.stop_stream()
-                print(f">>> Played {total_bytes} bytes")
-
-            # Properly close the stream
-            self.stop_playback()
-            print(">>> Playback completed")
+            elif self._writer.path and os.path.exists(self._writer.path):
+                # Recording was streamed to disk; play it back from the file
+                path = self._writer.path
+                info = sf.info(path)
+                print(f">>> Using recording file {path}")
+                print(f"    Duration: {info.duration:.2f}s")
+                # Blocks are read lazily as playback drains them
+                return self._playback.play(
+                    sf.blocks(path, blocksize=65536, dtype="int16"),
+                    info.samplerate,
+                    info.channels,
+                    2,
+                    self._output_device_id,
+                )
+            else:
+                print("!!! No audio data to play")
+                future = Future()
+                future.set_result(None)
+                return future
 
         except Exception as e:
             print(f"!!! Error during playback: {e}")
@@ -260,36 +339,33 @@ class PyAudioProvider(AudioInputProvider, AudioOutputProvider):
             raise
 
     def stop_playback(self) -> None:
-        """Stop current audio playback"""
-        if self._playback_stream:
-            try:
-                if not self._playback_stream.is_stopped():
-                    self._playback_stream.stop_stream()
-                self._playback_stream.close()
-            except Exception as e:
-                print(f"!!! Error stopping playback: {e}")
-            finally:
-                self._playback_stream = None
+        """Stop current audio playback immediately"""
+        self._playback.stop()
 
     def save_recording(self, filename: str) -> None:
         """Save the recorded audio to a WAV file"""
-        if not self._recorded_frames:
+        if self._writer.path and os.path.abspath(filename) == os.path.abspath(
+            self._writer.path
+        ):
+            print(f">>> Recording already streamed to {filename}")
+            return
+
+        if not len(self._recording):
             print("!!! No recorded audio to save")
             return
 
         try:
             print(f"\n=== Saving recording to {filename} ===")
-            print(f">>> Number of frames: {len(self._recorded_frames)}")
-
-            # Combine all frames
-            all_audio_data = b"".join(self._recorded_frames)
-            print(f">>> Total bytes: {len(all_audio_data)}")
+            print(f">>> Number of frames: {len(self._recording)}")
+            print(f">>> Total bytes: {self._recording.nbytes}")
 
             with wave.open(filename, "wb") as wf:
                 wf.setnchannels(self._config["channels"])
                 wf.setsampwidth(self._audio.get_sample_size(self._config["format"]))
                 wf.setframerate(self._config["rate"])
-                wf.writeframes(all_audio_data)
+                # Write block by block straight from the store's buffers
+                for view in self._recording.views():
+                    wf.writeframes(view)
 
                 # Debug info about the saved file
                 print(f">>> WAV file details:")
@@ -314,41 +390,72 @@ class PyAudioProvider(AudioInputProvider, AudioOutputProvider):
 
     def get_devices(self) -> list[dict]:
         """Get available input and output devices"""
+        if self._device_list is not None:
+            return self._device_list
+
         input_devices = []
         output_devices = []
         try:
-            info = self._audio.get_host_api_info_by_index(0)
-            numdevices = info.get("deviceCount")
+            host_api = self._audio.get_host_api_info_by_index(0)["name"]
+            self._capabilities = {}
 
-            for i in range(0, numdevices):
-                device_info = self._audio.get_device_info_by_host_api_device_index(0, i)
+            for entry in self._device_cache.get_devices(self._audio):
+                self._capabilities[entry["index"]] = entry
+                if entry["host_api"] != host_api:
+                    continue
                 device = {
-                    "id": i,
-                    "name": device_info["name"],
-                    "sample_rate": int(device_info["defaultSampleRate"]),
+                    "id": entry["index"],
+                    "name": entry["name"],
+                    "sample_rate": entry["default_sample_rate"],
                 }
 
-                if device_info.get("maxInputChannels") > 0:
+                if entry["max_input_channels"] > 0:
                     input_devices.append(device)
-                if device_info.get("maxOutputChannels") > 0:
+                if entry["max_output_channels"] > 0:
                     output_devices.append(device)
 
             if input_devices:
                 print(f">>> Found {len(input_devices)} input devices")
             if output_devices:
                 print(f">>> Found {len(output_devices)} output devices")
+            self._device_list = {"input": input_devices, "output": output_devices}
 
         except Exception as e:
             print(f"!!! Error enumerating devices: {e}")
         return {"input": input_devices, "output": output_devices}
 
+    def refresh_devices(self) -> None:
+        """Forget the enumerated devices so get_devices() reads them again"""
+        self._device_list = None
+        self._capabilities = None
+
+    def _input_format_supported(
+        self, device_id: int, rate: int, sample_format: str
+    ) -> bool:
+        """Answer from the capability cache, probing only what it doesn't cover"""
+        if self._capabilities is None:
+            self.get_devices()
+        entry = (self._capabilities or {}).get(device_id)
+        if entry is not None and rate in PROBE_RATES:
+            return supports(entry, "input", rate, sample_format)
+
+        try:
+            return self._audio.is_format_supported(
+                rate,
+                input_device=device_id,
+                input_channels=1,
+                input_format=self._pa_formats[sample_format],
+            )
+        except ValueError as e:
+            print(f"!!! {rate}Hz {sample_format} not supported: {e}")
+            return False
+
     def __del__(self):
         """Cleanup resources"""
         try:
             if self._stream:
                 self.stop_stream()
-            if self._playback_stream:
-                self.stop_playback()
+            self._playback.close()
             if self._audio:
                 self._audio.terminate()
         except Exception as e:
@@ -0,0 +1,124 @@
+import os
+import queue
+import threading
+import traceback
+import wave
+from typing import Optional
+import numpy as np
+import soundfile as sf
+
+
+class StreamingRecordingWriter:
+    """Background disk writer that appends captured blocks to a WAV or FLAC file.
+
+    Blocks are handed over through a queue so the capture callback never
+    touches the disk. WAV headers are patched after every write, so the file on
+    disk stays playable even if the application dies mid-recording.
+    """
+
+    _STOP = object()
+
+    def __init__(self, max_pending_blocks: int = 512):
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending_blocks)
+        self._thread: Optional[threading.Thread] = None
+        self._path: Optional[str] = None
+        self._frames_written = 0
+        self._dropped_blocks = 0
+        self._error: Optional[Exception] = None
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._path
+
+    @property
+    def frames_written(self) -> int:
+        return self._frames_written
+
+    def is_open(self) -> bool:
+        return self._thread is not None
+
+    def open(
+        self, path: str, sample_rate: int, channels: int = 1, sample_width: int = 2
+    ) -> None:
+        """Create the file and start the writer thread"""
+        if self._thread is not None:
+            self.close()
+
+        file_format = os.path.splitext(path)[1].lower().lstrip(".")
+        if file_format not in ("wav", "flac"):
+            raise ValueError(f"Unsupported recording format: {file_format}")
+        if sample_width != 2:
+            raise ValueError("Only 16-bit recordings are supported")
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if file_format == "wav":
+            sink = wave.open(path, "wb")
+            sink.setnchannels(channels)
+            sink.setsampwidth(sample_width)
+            sink.setframerate(sample_rate)
+        else:
+            sink = sf.SoundFile(
+                path,
+                mode="w",
+                samplerate=sample_rate,
+                channels=channels,
+                format="FLAC",
+                subtype="PCM_16",
+            )
+
+        self._path = path
+        self._frames_written = 0
+        self._dropped_blocks = 0
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._run, args=(sink, file_format, channels), daemon=True
+        )
+        self._thread.start()
+        print(f">>> Streaming recording to {path}")
+
+    def write(self, block: np.ndarray) -> None:
+        """Queue a block of int16 samples; safe to call from the audio callback"""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put_nowait(block)
+        except queue.Full:
+            self._dropped_blocks += 1
+
+    def close(self) -> Optional[str]:
+        """Flush pending blocks, finalize the file and return its path"""
+        if self._thread is None:
+            return self._path
+
+        self._queue.put(self._STOP)
+        self._thread.join()
+        self._thread = None
+
+        if self._dropped_blocks:
+            print(f"!!! Recording writer dropped {self._dropped_blocks} blocks")
+        if self._error is not None:
+            print(f"!!! Recording writer failed: {self._error}")
+        print(f">>> Recording closed: {self._path} ({self._frames_written} frames)")
+        return self._path
+
+    def _run(self, sink, file_format: str, channels: int) -> None:
+        try:
+            while True:
+                block = self._queue.get()
+                if block is self._STOP:
+                    break
+                if file_format == "wav":
+                    # writeframes() also rewrites the header sizes
+                    sink.writeframes(block.tobytes())
+                else:
+                    sink.write(block.reshape(-1, channels))
+                self._frames_written += len(block) // channels
+        except Exception as e:
+            self._error = e
+            print(f"!!! Error writing recording: {e}")
+            print(traceback.format_exc())
+            # Keep draining so the producer never blocks on a dead writer
+            while self._queue.get() is not self._STOP:
+                pass
+        finally:
+            sink.close()
@@ -2,6 +2,8 @@ import sounddevice as sd
 import numpy as np
 from io import BytesIO
 import wave
+from collections import deque
+from concurrent.futures import Future
 from typing import Optional
 from core.interfaces.audio import AudioInputProvider, AudioOutputProvider, AudioConfig
 from core.events import EventBus, Event, EventType
@@ -13,6 +15,8 @@ class SoundDeviceProvider(AudioInputProvider, AudioOutputProvider):
         self._config: Optional[AudioConfig] = None
         self._event_bus = EventBus.get_instance()
         self._playback_stream: Optional[sd.OutputStream] = None
+        self._playback_format: Optional[tuple] = None
+        self._playback_queue: deque = deque()
 
     def start_stream(self, config: AudioConfig) -> None:
         if self._stream is not None:
@@ -36,6 +40,18 @@ class SoundDeviceProvider(AudioInputProvider, AudioOutputProvider):
             print("Audio buffer overflow detected")
         return data.tobytes()
 
+    def read_available(self) -> bytes:
+        if not self._stream:
+            return b""
+
+        frames = self._stream.read_available
+        if frames <= 0:
+            return b""
+        data, overflowed = self._stream.read(frames)
+        if overflowed:
+            print("Audio buffer overflow detected")
+        return data.tobytes()
+
     def stop_stream(self) -> None:
         if self._stream:
             self._stream.stop()
@@ -57,22 +73,63 @@ class SoundDeviceProvider(AudioInputProvider, AudioOutputProvider):
                 )
         return devices
 
-    def play_audio(self, audio_data: BytesIO) -> None:
-        if self._playback_stream is not None:
-            self.stop_playback()
-
+    def play_audio(self, audio_data: BytesIO) -> Future:
+        """Queue a WAV clip on the output stream and return a completion Future"""
         with wave.Wave_read(audio_data) as wf:
+            channels = wf.getnchannels()
+            rate = wf.getframerate()
             data = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
-            self._playback_stream = sd.play(
-                data, wf.getframerate(), channels=wf.getnchannels()
+
+        future: Future = Future()
+        if (rate, channels) != self._playback_format:
+            self.stop_playback()
+            self._close_playback_stream()
+            # Kept open between clips so later ones start without a reopen
+            self._playback_stream = sd.OutputStream(
+                samplerate=rate,
+                channels=channels,
+                dtype="int16",
+                callback=self._playback_callback,
             )
-            sd.wait()  # Wait until file is done playing
+            self._playback_format = (rate, channels)
+        self._playback_queue.append([data.reshape(-1, channels), 0, future])
+        if not self._playback_stream.active:
+            self._playback_stream.start()
+        return future
+
+    def _playback_callback(self, outdata, frames, time, status) -> None:
+        """PortAudio callback: copy queued clips into the output buffer"""
+        filled = 0
+        try:
+            while filled < frames and self._playback_queue:
+                item = self._playback_queue[0]
+                data, position, future = item
+                count = min(frames - filled, len(data) - position)
+                outdata[filled : filled + count] = data[position : position + count]
+                filled += count
+                item[1] = position + count
+                if item[1] >= len(data):
+                    self._playback_queue.popleft()
+                    if not future.done():
+                        future.set_result(None)
+        except IndexError:
+            pass  # stop_playback() emptied the queue while we were reading it
+        outdata[filled:] = 0
 
     def stop_playback(self) -> None:
-        if self._playback_stream:
-            sd.stop()
+        """Drop queued clips; the stream keeps running and plays silence"""
+        while self._playback_queue:
+            _, _, future = self._playback_queue.popleft()
+            future.cancel()
+
+    def _close_playback_stream(self) -> None:
+        if self._playback_stream is not None:
+            self._playback_stream.stop()
+            self._playback_stream.close()
             self._playback_stream = None
+            self._playback_format = None
 
     def __del__(self):
         self.stop_stream()
         self.stop_playback()
+        self._close_playback_stream()
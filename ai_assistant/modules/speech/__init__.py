@@ -3,11 +3,13 @@ from typing import Dict, Any
 from core.interfaces.speech import SpeechToTextProvider
 from .whisper_provider import WhisperProvider
 from .deepgram_provider import DeepgramProvider
+from .hedged_provider import HedgedSpeechProvider
 
 
 class SpeechProviderType(Enum):
     WHISPER = "whisper"
     DEEPGRAM = "deepgram"
+    HEDGED = "hedged"
 
 
 def create_speech_provider(
@@ -19,10 +21,20 @@ def create_speech_provider(
         "deepgram": DeepgramProvider,
     }
 
-    if provider_type not in providers:
+    if provider_type == "hedged":
+        # Race the configured backends, each set up from its own section
+        config = config or {}
+        hedged = config.get("hedged", config) or {}
+        names = hedged.get("backends", ["whisper", "deepgram"])
+        if "hedged" in names:
+            raise ValueError("A hedged speech provider cannot race itself")
+        provider = HedgedSpeechProvider(
+            [(name, create_speech_provider(name, config.get(name))) for name in names]
+        )
+    elif provider_type not in providers:
         raise ValueError(f"Unknown speech provider type: {provider_type}")
-
-    provider = providers[provider_type]()
+    else:
+        provider = providers[provider_type]()
 
     # Configure the provider if it has a configure method
     if hasattr(provider, "configure") and config:
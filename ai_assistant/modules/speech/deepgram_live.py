@@ -0,0 +1,275 @@
+import asyncio
+import json
+from collections import deque
+from typing import AsyncIterator, Deque, List, Optional, Tuple
+from urllib.parse import urlencode
+import websockets
+from core.interfaces.speech import TranscriptHypothesis
+from utils.vad import EnergyVAD, VADEventType
+
+DEFAULT_LIVE_URL = "wss://api.deepgram.com/v1/listen"
+KEEPALIVE = json.dumps({"type": "KeepAlive"})
+CLOSE_STREAM = json.dumps({"type": "CloseStream"})
+FINALIZE = json.dumps({"type": "Finalize"})
+
+
+class DeepgramLiveSession:
+    """One Deepgram live transcription session over a WebSocket.
+
+    linear16 frames are sent as they are captured while interim and final
+    results are read back concurrently. A KeepAlive message holds the
+    connection open whenever no audio has been sent for `keepalive_interval`
+    seconds. Audio not yet covered by a final result is kept (up to
+    `max_replay_seconds`), so a dropped connection is reopened and that audio
+    replayed before streaming continues.
+
+    With a `vad`, silent frames are not sent at all (KeepAlive covers the
+    gaps) and each speech end asks Deepgram to finalize. Result timestamps
+    are mapped back to stream time across both gaps and reconnects.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        options: Optional[dict] = None,
+        url: str = DEFAULT_LIVE_URL,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        keepalive_interval: float = 5.0,
+        max_reconnects: int = 5,
+        max_replay_seconds: float = 30.0,
+        vad: Optional[EnergyVAD] = None,
+        preroll_seconds: float = 0.3,
+    ):
+        self._api_key = api_key
+        self._options = options or {}
+        self._url = url
+        self._sample_rate = sample_rate
+        self._channels = channels
+        self._keepalive_interval = keepalive_interval
+        self._max_reconnects = max_reconnects
+        self._max_replay_seconds = max_replay_seconds
+        self._vad = vad
+        self._preroll_seconds = preroll_seconds  # Silence sent ahead of speech
+        self._ws = None
+        self._lock = asyncio.Lock()  # Serializes sends and replay
+        # (stream time in seconds, frame) for audio without a final result yet
+        self._pending: Deque[Tuple[float, bytes]] = deque()
+        self._stream_seconds = 0.0  # Audio captured so far, sent or not
+        # (connection time, stream time) wherever the audio sent on the
+        # current connection jumps in stream time: its start and VAD gaps
+        self._timeline: List[Tuple[float, float]] = []
+        self._connection_seconds = 0.0  # Audio sent on the current connection
+        self._sent_end: Optional[float] = None  # Stream time after last frame
+        self._last_send = 0.0
+        self._finishing = False
+
+    def _endpoint(self) -> str:
+        params = {
+            "encoding": "linear16",
+            "sample_rate": self._sample_rate,
+            "channels": self._channels,
+            "interim_results": True,
+            **self._options,
+        }
+        query = urlencode(
+            {
+                key: str(value).lower() if isinstance(value, bool) else value
+                for key, value in params.items()
+                if value is not None
+            }
+        )
+        return f"{self._url}?{query}"
+
+    async def _open(self):
+        # Deepgram accepts the key as a subprotocol, which avoids the header
+        # argument that differs between websockets releases
+        return await websockets.connect(
+            self._endpoint(), subprotocols=["token", self._api_key]
+        )
+
+    def _attach(self, ws) -> None:
+        """Make `ws` the current connection; its clock starts at zero"""
+        self._ws = ws
+        self._timeline = []
+        self._connection_seconds = 0.0
+        self._sent_end = None
+        self._last_send = asyncio.get_running_loop().time()
+
+    def _duration(self, frame: bytes) -> float:
+        return len(frame) / (2 * self._channels * self._sample_rate)
+
+    async def run(
+        self, audio_stream: AsyncIterator[bytes]
+    ) -> AsyncIterator[TranscriptHypothesis]:
+        """Stream interleaved linear16 frames and yield interim and final results"""
+        results: asyncio.Queue = asyncio.Queue()
+        self._attach(await self._open())
+        print(">>> Deepgram live session opened")
+        tasks = [
+            asyncio.create_task(self._send_audio(audio_stream, results)),
+            asyncio.create_task(self._receive(results)),
+            asyncio.create_task(self._keepalive()),
+        ]
+        try:
+            while True:
+                item = await results.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await self.close()
+            print(">>> Deepgram live session closed")
+
+    async def close(self) -> None:
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+
+    async def _send(self, message) -> None:
+        try:
+            await self._ws.send(message)
+            self._last_send = asyncio.get_running_loop().time()
+        except websockets.ConnectionClosed:
+            pass  # The receiver reconnects and replays pending audio
+
+    async def _send_frame(self, start: float, frame: bytes) -> None:
+        """Send audio captured at stream time `start`; call with the lock held"""
+        if self._sent_end is None or abs(start - self._sent_end) > 1e-6:
+            self._timeline.append((self._connection_seconds, start))
+        duration = self._duration(frame)
+        self._connection_seconds += duration
+        self._sent_end = start + duration
+        await self._send(frame)
+
+    async def _send_audio(
+        self, audio_stream: AsyncIterator[bytes], results: asyncio.Queue
+    ) -> None:
+        preroll: Deque[Tuple[float, bytes]] = deque()
+        try:
+            async for frame in audio_stream:
+                if not frame:
+                    continue
+                start = self._stream_seconds
+                self._stream_seconds += self._duration(frame)
+                frames = [(start, frame)]
+                finalize = False
+                if self._vad is not None:
+                    events = self._vad.process(frame)
+                    if not (self._vad.is_speech or events):
+                        # Silence: hold a little back in case speech follows
+                        preroll.append((start, frame))
+                        while (
+                            self._stream_seconds - preroll[0][0] > self._preroll_seconds
+                        ):
+                            preroll.popleft()
+                        continue
+                    frames = list(preroll) + frames
+                    preroll.clear()
+                    finalize = not self._vad.is_speech and any(
+                        event.type == VADEventType.SPEECH_END for event in events
+                    )
+                async with self._lock:
+                    for start, frame in frames:
+                        self._pending.append((start, frame))
+                        await self._send_frame(start, frame)
+                    while (
+                        len(self._pending) > 1
+                        and self._stream_seconds - self._pending[0][0]
+                        > self._max_replay_seconds
+                    ):
+                        self._pending.popleft()
+                    if finalize:
+                        await self._send(FINALIZE)
+            async with self._lock:
+                self._finishing = True
+                await self._send(CLOSE_STREAM)
+        except Exception as e:
+            results.put_nowait(e)
+
+    async def _keepalive(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self._keepalive_interval / 2)
+            if loop.time() - self._last_send >= self._keepalive_interval:
+                async with self._lock:
+                    await self._send(KEEPALIVE)
+
+    async def _receive(self, results: asyncio.Queue) -> None:
+        while True:
+            ws = self._ws
+            try:
+                async for message in ws:
+                    hypothesis = self._handle(message)
+                    if hypothesis is not None:
+                        results.put_nowait(hypothesis)
+                if self._finishing:
+                    results.put_nowait(None)  # Server flushed and closed
+                    return
+            except websockets.ConnectionClosed as e:
+                print(f"!!! Deepgram connection lost: {e}")
+            try:
+                await self._reconnect()
+            except Exception as e:
+                results.put_nowait(e)
+                return
+
+    async def _reconnect(self) -> None:
+        # Back off without the lock: capture keeps queueing frames in
+        # _pending meanwhile, and their sends to the dead socket are dropped
+        for attempt in range(self._max_reconnects):
+            await asyncio.sleep(min(0.25 * 2**attempt, 5.0))
+            try:
+                ws = await self._open()
+                break
+            except (OSError, websockets.WebSocketException) as e:
+                print(f"!!! Deepgram reconnect {attempt + 1} failed: {e}")
+        else:
+            raise ConnectionError("Could not reconnect to Deepgram")
+
+        async with self._lock:
+            # Nothing new goes out until the unacknowledged audio is replayed
+            self._attach(ws)
+            print(f">>> Deepgram reconnected, replaying {len(self._pending)} frames")
+            for start, frame in list(self._pending):
+                await self._send_frame(start, frame)
+            if self._finishing:
+                await self._send(CLOSE_STREAM)
+
+    def _to_stream_time(self, seconds: float) -> float:
+        """Map a time on the current connection to stream time"""
+        for connection_time, stream_time in reversed(self._timeline):
+            if connection_time <= seconds + 1e-6:
+                return stream_time + (seconds - connection_time)
+        return seconds
+
+    def _handle(self, message) -> Optional[TranscriptHypothesis]:
+        if isinstance(message, bytes):
+            return None
+        data = json.loads(message)
+        if data.get("type") != "Results":
+            return None
+        start = self._to_stream_time(data.get("start", 0.0))
+        end = start + data.get("duration", 0.0)
+        is_final = bool(data.get("is_final"))
+        if is_final:
+            self._acknowledge(end)
+        text = data["channel"]["alternatives"][0]["transcript"]
+        return TranscriptHypothesis(text, is_final, start=start, end=end)
+
+    def _acknowledge(self, end: float) -> None:
+        """Drop audio up to stream time `end`; it can no longer be needed"""
+        frame_bytes = 2 * self._channels  # One sample for every channel
+        while self._pending:
+            start, frame = self._pending[0]
+            if start + self._duration(frame) <= end:
+                self._pending.popleft()
+                continue
+            if start < end:
+                cut = int((end - start) * self._sample_rate) * frame_bytes
+                self._pending[0] = (start + self._duration(frame[:cut]), frame[cut:])
+            break
@@ -1,16 +1,19 @@
-from typing import AsyncIterator, Optional
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
 import os
 import asyncio
 import numpy as np
-from scipy import signal
 from deepgram import DeepgramClient
-from core.interfaces.speech import SpeechToTextProvider
+from core.interfaces.speech import SpeechToTextProvider, TranscriptHypothesis
+from core.events import EventBus, Event, EventType
+from utils.vad import EnergyVAD
+from utils.resampler import StreamingResampler
+from utils.audio_encoder import UploadEncoder
+from utils.pcm_window import PCMWindow
 import traceback
-import io
-import wave
 import logging
-from collections import deque
-import gc
+from utils.transcript import HypothesisTracker
+from .deepgram_live import DEFAULT_LIVE_URL, DeepgramLiveSession
 
 
 class DeepgramProvider(SpeechToTextProvider):
@@ -26,7 +29,17 @@ class DeepgramProvider(SpeechToTextProvider):
         self._target_rate = 16000
         self._chunk_size = None
         self._channels = None
-        self._max_buffer_size = 5  # Maximum number of chunks to store
+        self._vad_config = {}
+        self._sample_dtype = np.float32
+        self._mode = "live"  # One WebSocket session; "windowed" for REST uploads
+        self._live_url = DEFAULT_LIVE_URL
+        self._keepalive_interval = 5.0
+        self._max_in_flight = 4  # Concurrent window requests in windowed mode
+        self._model = "nova-2"
+        self._language = "en"
+        self._smart_format = True
+        self._encoder = UploadEncoder()
+        self._event_bus = EventBus.get_instance()
         print(">>> Provider initialized")
 
     def configure(self, config: dict):
@@ -35,26 +48,182 @@ class DeepgramProvider(SpeechToTextProvider):
         self._source_rate = config.get("sample_rate", 48000)
         self._chunk_size = config.get("chunk_size", 2048)
         self._channels = config.get("channels", 1)
+        self._vad_config = config.get("vad", {}) or {}
+        self._mode = config.get("mode", self._mode)
+        self._live_url = config.get("live_url", self._live_url)
+        self._keepalive_interval = config.get(
+            "keepalive_interval", self._keepalive_interval
+        )
+        self._max_in_flight = config.get("max_in_flight", self._max_in_flight)
+        self._model = config.get("model", self._model)
+        self._language = config.get("language", self._language)
+        self._smart_format = config.get("smart_format", self._smart_format)
+        self._encoder = UploadEncoder.from_config(config.get("upload"))
+        print(f">>> Mode: {self._mode}")
+        print(f">>> Upload codec: {self._encoder.codec}")
         print(f">>> Source sample rate: {self._source_rate}")
         print(f">>> Chunk size: {self._chunk_size}")
         print(f">>> Channels: {self._channels}")
 
+    def set_input_format(self, sample_rate: int, sample_format: str) -> None:
+        """Use the capture format reported by the audio provider"""
+        print(f">>> Deepgram input format: {sample_rate}Hz {sample_format}")
+        self._source_rate = sample_rate
+        self._sample_dtype = np.dtype(sample_format)
+
     async def transcribe_stream(
         self, audio_stream: AsyncIterator[bytes]
     ) -> AsyncIterator[str]:
+        """Yield final text only; see stream_hypotheses() for interim results"""
+        async for hypothesis in self.stream_hypotheses(audio_stream):
+            if hypothesis.is_final and hypothesis.text.strip():
+                yield hypothesis.text
+
+    async def stream_hypotheses(
+        self, audio_stream: AsyncIterator[bytes]
+    ) -> AsyncIterator[TranscriptHypothesis]:
+        """Yield interim and final text, publishing each as TRANSCRIPTION_RESULT.
+
+        Windowed mode has no interim results and yields finals only.
+        """
         print("\n=== Starting Deepgram transcription ===")
         if not self._source_rate:
             raise ValueError("Source sample rate not configured")
 
+        if self._mode == "live":
+            source = self._stream_live(audio_stream)
+        else:
+            source = self._stream_windows(audio_stream)
+        tracker = HypothesisTracker()
+        async for hypothesis in source:
+            hypothesis = tracker.track(hypothesis)
+            if self.publish_events:
+                await self._event_bus.emit(
+                    Event(EventType.TRANSCRIPTION_RESULT, data=hypothesis)
+                )
+            yield hypothesis
+
+    async def _stream_windows(
+        self, audio_stream: AsyncIterator[bytes]
+    ) -> AsyncIterator[TranscriptHypothesis]:
+        self._running = True
+        results: asyncio.Queue = asyncio.Queue()
+        capture = asyncio.create_task(self._capture_windows(audio_stream, results))
         try:
-            self._running = True
-            buffer = deque(maxlen=self._max_buffer_size)  # Use deque with max size
-            total_samples = 0
-            min_samples = int(self._source_rate * 0.5)  # Process every 0.5 seconds
+            while True:
+                hypothesis = await results.get()
+                if hypothesis is None:
+                    break
+                yield hypothesis
+        finally:
+            capture.cancel()
+            self._running = False
+            print(">>> Transcription ended")
+
+    async def _capture_windows(
+        self, audio_stream: AsyncIterator[bytes], results: asyncio.Queue
+    ) -> None:
+        """Cut the stream into windows and upload up to max_in_flight at once.
+
+        Capture never waits on the network: a full window is handed to its
+        own request task and a window from the pool takes its place. Each
+        window gets a sequence number, and final hypotheses are put on
+        `results` in capture order, followed by None once the stream is done.
+
+        Windows wait in a backlog while max_in_flight requests are running.
+        If the backlog grows past four times that, the oldest queued window
+        is dropped with a warning rather than holding audio without bound.
+        """
+        # Counted at the target rate; chunks are resampled on arrival
+        min_samples = int(self._target_rate * 0.5)  # Process every 0.5 seconds
+        resampler = StreamingResampler(self._source_rate, self._target_rate)
+        # Preallocated windows are recycled once their request finishes, so
+        # the steady state allocates nothing when no resampling is needed
+        free_windows: List[PCMWindow] = []
+        in_flight: Set[asyncio.Task] = set()
+        # (sequence, window, start) waiting for a free request slot
+        backlog: Deque[Tuple[int, PCMWindow, int]] = deque()
+        max_backlog = 4 * self._max_in_flight
+        completed: Dict[int, TranscriptHypothesis] = {}
+        next_sequence = 0
+        next_delivery = 0
+        window_start = 0  # Stream position of the current window, in samples
+
+        print(f">>> Buffer will process every {min_samples} samples")
+        print(f">>> Up to {self._max_in_flight} requests in flight")
+
+        def take_window() -> PCMWindow:
+            if free_windows:
+                return free_windows.pop()
+            return PCMWindow(self._target_rate, min_samples + 4096)
+
+        def empty_result(window: PCMWindow, start: int) -> TranscriptHypothesis:
+            return TranscriptHypothesis(
+                "",
+                True,
+                start=start / self._target_rate,
+                end=(start + len(window)) / self._target_rate,
+            )
+
+        def recycle(window: PCMWindow) -> None:
+            window.clear()
+            free_windows.append(window)
+
+        def deliver(sequence: int, hypothesis: TranscriptHypothesis) -> None:
+            nonlocal next_delivery
+            completed[sequence] = hypothesis
+            # Release every transcript whose predecessors have all arrived
+            while next_delivery in completed:
+                hypothesis = completed.pop(next_delivery)
+                next_delivery += 1
+                if hypothesis.text.strip():
+                    results.put_nowait(hypothesis)
 
-            print(f">>> Buffer will process every {min_samples} samples")
-            print(f">>> Max buffer size: {self._max_buffer_size} chunks")
+        def start_upload(sequence: int, window: PCMWindow, start: int) -> None:
+            task = asyncio.create_task(upload(sequence, window, start))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
 
+        def submit(sequence: int, window: PCMWindow, start: int) -> None:
+            if len(in_flight) < self._max_in_flight:
+                start_upload(sequence, window, start)
+                return
+            backlog.append((sequence, window, start))
+            if len(backlog) > max_backlog:
+                sequence, window, start = backlog.popleft()
+                print(
+                    f"!!! Deepgram requests are falling behind; dropping "
+                    f"{len(window) / self._target_rate:.1f}s of queued audio"
+                )
+                deliver(sequence, empty_result(window, start))
+                recycle(window)
+
+        async def upload(sequence: int, window: PCMWindow, start: int) -> None:
+            hypothesis = empty_result(window, start)
+            try:
+                hypothesis.text = await self._transcribe_window(window)
+            except Exception as e:
+                print(f"!!! Error processing buffer: {e}")
+                print(traceback.format_exc())
+            finally:
+                recycle(window)
+            deliver(sequence, hypothesis)
+            # Free the slot now; the done callback runs too late for submit()
+            in_flight.discard(asyncio.current_task())
+            if backlog:
+                start_upload(*backlog.popleft())
+
+        # Optional VAD gate so silent windows are never uploaded
+        vad = None
+        window_has_speech = False
+        if self._vad_config.get("enabled"):
+            vad = EnergyVAD.from_config(
+                self._source_rate, self._vad_config, dtype=self._sample_dtype
+            )
+            print(">>> VAD gating enabled")
+
+        window = take_window()
+        try:
             async for chunk in audio_stream:
                 if not self._running:
                     break
@@ -64,117 +233,140 @@ class DeepgramProvider(SpeechToTextProvider):
                         print("!!! Warning: Empty chunk received")
                         continue
 
-                    # Convert bytes to float32 array
-                    audio_float = np.frombuffer(
-                        chunk, dtype=np.float32
-                    ).copy()  # Make a copy
-                    if len(audio_float) == 0:
-                        print("!!! Warning: Empty audio data after conversion")
+                    # Zero-copy view; the window converts to int16 in place
+                    audio = np.frombuffer(chunk, dtype=self._sample_dtype)
+
+                    if vad is not None:
+                        events = vad.process(audio)
+                        window_has_speech |= vad.is_speech or bool(events)
+
+                    if not resampler.passthrough:
+                        if audio.dtype == np.int16:
+                            audio = audio * np.float32(1 / 32768)
+                        audio = resampler.process(audio)
+                    window.append(audio)
+
+                    if len(window) < min_samples:
                         continue
 
-                    # Normalize if needed
-                    max_val = np.max(np.abs(audio_float))
-                    if max_val > 1.0:
-                        audio_float = audio_float / max_val
-
-                    # Add to buffer
-                    buffer.append(audio_float)
-                    total_samples += len(audio_float)
-
-                    # Process when we have enough samples
-                    if total_samples >= min_samples:
-                        try:
-                            # Convert buffer to list and concatenate
-                            audio_data = np.concatenate(list(buffer))
-
-                            # Clear buffer references
-                            buffer.clear()
-                            gc.collect()  # Force garbage collection
-
-                            # Resample to target rate
-                            target_length = int(
-                                len(audio_data) * self._target_rate / self._source_rate
-                            )
-                            resampled = signal.resample(audio_data, target_length)
-
-                            # Clear original audio data
-                            del audio_data
-                            gc.collect()
-
-                            # Convert to int16
-                            audio_int16 = (resampled * 32767.0).astype(np.int16)
-                            del resampled
-                            gc.collect()
-
-                            # Create WAV buffer
-                            wav_buffer = io.BytesIO()
-                            with wave.open(wav_buffer, "wb") as wav:
-                                wav.setnchannels(1)
-                                wav.setsampwidth(2)
-                                wav.setframerate(self._target_rate)
-                                wav.writeframes(audio_int16.tobytes())
-
-                            del audio_int16
-                            gc.collect()
-
-                            # Reset position for reading
-                            wav_buffer.seek(0)
-
-                            # Send to Deepgram
-                            response = await self.client.transcription.prerecorded.v(
-                                "1"
-                            ).transcribe(
-                                {"buffer": wav_buffer.read(), "mimetype": "audio/wav"},
-                                {
-                                    "smart_format": True,
-                                    "model": "nova-2",
-                                    "language": "en",
-                                    "punctuate": True,
-                                },
-                            )
-
-                            # Extract transcription
-                            transcript = response["results"]["channels"][0][
-                                "alternatives"
-                            ][0]["transcript"]
-
-                            if transcript.strip():
-                                yield transcript
-
-                            # Reset counters
-                            total_samples = 0
-                            gc.collect()
-
-                        except Exception as e:
-                            print(f"!!! Error processing buffer: {e}")
-                            print(traceback.format_exc())
-                            buffer.clear()
-                            total_samples = 0
-                            gc.collect()
+                    if vad is not None and not window_has_speech:
+                        # Nothing but silence in this window; don't upload it
+                        window_start += len(window)
+                        window.clear()
+                        continue
+
+                    if vad is not None:
+                        window_has_speech = vad.is_speech
+                    submit(next_sequence, window, window_start)
+                    next_sequence += 1
+                    window_start += len(window)
+                    window = take_window()
 
                 except Exception as e:
                     print(f"!!! Error processing chunk: {e}")
                     print(traceback.format_exc())
-                    buffer.clear()
-                    total_samples = 0
-                    gc.collect()
+                    window_start += len(window)
+                    window.clear()
 
+            # Each finished upload starts the next queued window
+            while in_flight or backlog:
+                if not in_flight:
+                    start_upload(*backlog.popleft())
+                await asyncio.gather(*list(in_flight))
         except Exception as e:
             print(f"!!! Transcription error: {e}")
             print(traceback.format_exc())
+        finally:
+            for task in in_flight:
+                task.cancel()
+            results.put_nowait(None)
+
+    async def _transcribe_window(self, window: PCMWindow) -> str:
+        """Upload one window as a prerecorded request and return its transcript"""
+        if self._encoder.choose(2 * len(window), window.sample_rate) == "wav":
+            # Sent straight from the window's buffer without a copy
+            payload, mimetype = window.wav(), "audio/wav"
+        else:
+            payload, mimetype = self._encoder.encode(window.samples, window.sample_rate)
+        response = await self.client.transcription.prerecorded.v("1").transcribe(
+            {"buffer": payload, "mimetype": mimetype},
+            {
+                "smart_format": self._smart_format,
+                "model": self._model,
+                "language": self._language,
+                "punctuate": True,
+            },
+        )
+        return response["results"]["channels"][0]["alternatives"][0]["transcript"]
+
+    async def _stream_live(
+        self, audio_stream: AsyncIterator[bytes]
+    ) -> AsyncIterator[TranscriptHypothesis]:
+        """Stream audio over a live session, yielding interim and final text"""
+        channels = self._channels or 1
+        vad = None
+        if self._vad_config.get("enabled"):
+            # Silence is held back from the session; scored on the
+            # interleaved samples, so the rate counts every channel
+            vad = EnergyVAD.from_config(
+                self._source_rate * channels, self._vad_config, dtype=np.int16
+            )
+            print(">>> VAD gating enabled")
+        session = DeepgramLiveSession(
+            self.api_key,
+            options={
+                "model": self._model,
+                "language": self._language,
+                "smart_format": self._smart_format,
+                "punctuate": True,
+            },
+            url=self._live_url,
+            sample_rate=self._source_rate,
+            channels=channels,
+            keepalive_interval=self._keepalive_interval,
+            vad=vad,
+        )
+        self._running = True
+        try:
+            async for hypothesis in session.run(self._linear16(audio_stream)):
+                yield hypothesis
         finally:
             self._running = False
             print(">>> Transcription ended")
 
+    async def _linear16(
+        self, audio_stream: AsyncIterator[bytes]
+    ) -> AsyncIterator[bytes]:
+        """Captured chunks as linear16 at the capture rate and channel count.
+
+        int16 passes through; interleaved channels stay interleaved, as the
+        live session declares them to Deepgram.
+        """
+        async for chunk in audio_stream:
+            if not self._running:
+                break
+            if self._sample_dtype == np.int16:
+                yield chunk
+                continue
+            audio = np.clip(np.frombuffer(chunk, dtype=self._sample_dtype), -1.0, 1.0)
+            yield (audio * 32767.0).astype(np.int16).tobytes()
+
     async def transcribe_file(self, audio_file: bytes) -> str:
         try:
-            wav_buffer = io.BytesIO(audio_file)
+            # Encoding a long recording takes a while; keep it off the event loop
+            payload, mimetype = await asyncio.to_thread(
+                self._encoder.encode_file, audio_file
+            )
+            print(
+                f">>> Uploading {len(payload)} bytes as {mimetype} "
+                f"({len(audio_file)} bytes uncompressed)"
+            )
             response = await self.client.transcription.prerecorded.v("1").transcribe(
-                {"buffer": wav_buffer.read(), "mimetype": "audio/wav"},
+                {"buffer": payload, "mimetype": mimetype},
                 {
-                    "smart_format": True,
-                    "model": "nova-2",
-                    "language": "en",
+                    "smart_format": self._smart_format,
+                    "model": self._model,
+                    "language": self._language,
                 },
             )
             return response["results"]["channels"][0]["alternatives"][0]["transcript"]
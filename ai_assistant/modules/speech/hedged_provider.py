@@ -0,0 +1,188 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from core.interfaces.speech import SpeechToTextProvider
+from utils.vad import EnergyVAD, VADEventType
+
+
+class HedgedSpeechProvider(SpeechToTextProvider):
+    """Race several speech backends on the same audio and keep the first good text.
+
+    Backends are tried in order of preference. The first starts right away;
+    each further one starts only if nothing acceptable has arrived within
+    `launch_delay` seconds, or at once when every running backend has failed.
+    The first result of at least `min_chars` characters wins and the other
+    requests are cancelled. If none qualifies, the longest result is used.
+
+    Streams are cut into utterances with the energy VAD, and each utterance
+    is replayed to the backends as a short stream of its own.
+
+    Cancelling a losing request stops it waiting, but a Whisper job that a
+    worker process has already started runs to completion; the next job on
+    that worker queues behind it.
+    """
+
+    def __init__(self, backends: List[Tuple[str, SpeechToTextProvider]]):
+        if not backends:
+            raise ValueError("Hedged speech provider needs at least one backend")
+        self._backends = backends
+        for _, backend in backends:
+            backend.publish_events = False  # Only the winning text is published
+        self._launch_delay = 0.5
+        self._min_chars = 2
+        self._vad_config = {}
+        self._sample_rate = 16000
+        self._sample_dtype = np.float32
+        self._preroll_seconds = 0.3
+
+    def configure(self, config: dict):
+        """Configure the race from the `hedged` section of the speech config"""
+        hedged = config.get("hedged", config) or {}
+        print(f"\n=== Configuring hedged speech with: {hedged} ===")
+        self._launch_delay = hedged.get("launch_delay", self._launch_delay)
+        self._min_chars = hedged.get("min_chars", self._min_chars)
+        self._vad_config = hedged.get("vad", {}) or {}
+        print(f">>> Backends: {[name for name, _ in self._backends]}")
+        print(f">>> Launch delay: {self._launch_delay}s")
+
+    def set_input_format(self, sample_rate: int, sample_format: str) -> None:
+        self._sample_rate = sample_rate
+        self._sample_dtype = np.dtype(sample_format)
+        for _, backend in self._backends:
+            backend.set_input_format(sample_rate, sample_format)
+
+    async def warm_up(self) -> None:
+        results = await asyncio.gather(
+            *(backend.warm_up() for _, backend in self._backends),
+            return_exceptions=True,
+        )
+        # One backend that failed to load still leaves the others to race
+        if all(isinstance(result, Exception) for result in results):
+            raise results[-1]
+        await super().warm_up()  # Backends don't publish; announce once for all
+
+    def close(self) -> None:
+        for _, backend in self._backends:
+            if hasattr(backend, "close"):
+                backend.close()
+
+    async def transcribe_file(self, audio_file: bytes) -> str:
+        return await self._race(lambda backend: backend.transcribe_file(audio_file))
+
+    async def transcribe_stream(
+        self, audio_stream: AsyncIterator[bytes]
+    ) -> AsyncIterator[str]:
+        """Yield the winning text for each utterance, in order"""
+        utterances: asyncio.Queue = asyncio.Queue()
+        capture = asyncio.create_task(self._split_utterances(audio_stream, utterances))
+        try:
+            while True:
+                chunks = await utterances.get()
+                if chunks is None:
+                    break
+                text = await self._race(
+                    lambda backend: self._transcribe_chunks(backend, chunks)
+                )
+                if text.strip():
+                    yield text
+        finally:
+            capture.cancel()
+
+    async def _split_utterances(
+        self, audio_stream: AsyncIterator[bytes], utterances: asyncio.Queue
+    ) -> None:
+        """Collect chunks from speech start to speech end; never waits on a race"""
+        vad = EnergyVAD.from_config(
+            self._sample_rate, self._vad_config, dtype=self._sample_dtype
+        )
+        preroll = deque()  # A little audio from before speech starts
+        preroll_bytes = 0
+        preroll_limit = (
+            int(self._sample_rate * self._preroll_seconds) * self._sample_dtype.itemsize
+        )
+        utterance: Optional[List[bytes]] = None
+        try:
+            async for chunk in audio_stream:
+                events = vad.process(chunk)
+                if utterance is None:
+                    preroll.append(chunk)
+                    preroll_bytes += len(chunk)
+                    while preroll_bytes - len(preroll[0]) >= preroll_limit:
+                        preroll_bytes -= len(preroll.popleft())
+                    if vad.is_speech or events:
+                        utterance = list(preroll)
+                        preroll.clear()
+                        preroll_bytes = 0
+                else:
+                    utterance.append(chunk)
+                if utterance is not None and any(
+                    event.type == VADEventType.SPEECH_END for event in events
+                ):
+                    utterances.put_nowait(utterance)
+                    utterance = None
+            if utterance is not None:
+                utterances.put_nowait(utterance)
+        finally:
+            utterances.put_nowait(None)
+
+    @staticmethod
+    async def _transcribe_chunks(
+        backend: SpeechToTextProvider, chunks: List[bytes]
+    ) -> str:
+        async def replay():
+            for chunk in chunks:
+                yield chunk
+
+        texts = [text async for text in backend.transcribe_stream(replay())]
+        return " ".join(text.strip() for text in texts if text.strip())
+
+    async def _race(
+        self, request: Callable[[SpeechToTextProvider], Awaitable[str]]
+    ) -> str:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        waiting = list(self._backends)
+        running: Dict[asyncio.Task, str] = {}
+        rejected: List[str] = []
+        errors: List[Exception] = []
+
+        def launch() -> None:
+            name, backend = waiting.pop(0)
+            print(f">>> Hedged request to {name} at {loop.time() - start:.2f}s")
+            running[asyncio.create_task(request(backend))] = name
+
+        try:
+            launch()
+            next_launch = loop.time() + self._launch_delay
+            while running or waiting:
+                if not running:
+                    launch()  # Everything in flight failed; hedge right away
+                    next_launch = loop.time() + self._launch_delay
+                timeout = max(0.0, next_launch - loop.time()) if waiting else None
+                done, _ = await asyncio.wait(
+                    running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    launch()  # The leader is slow; start the next backend
+                    next_launch = loop.time() + self._launch_delay
+                    continue
+                for task in done:
+                    name = running.pop(task)
+                    try:
+                        text = task.result()
+                    except Exception as e:
+                        print(f"!!! {name} transcription failed: {e}")
+                        errors.append(e)
+                        continue
+                    if len(text.strip()) >= self._min_chars:
+                        print(f">>> {name} won after {loop.time() - start:.2f}s")
+                        return text
+                    rejected.append(text)
+        finally:
+            for task in running:
+                task.cancel()
+
+        if rejected:
+            return max(rejected, key=lambda text: len(text.strip()))
+        raise errors[-1]
@@ -0,0 +1,122 @@
+import asyncio
+import io
+import traceback
+from collections import deque
+from typing import AsyncIterator, Optional
+from core.interfaces.audio import AudioOutputProvider
+from core.interfaces.speech import TextToSpeechProvider
+from utils.text_segmenter import SentenceSegmenter
+
+_END = object()  # Queue sentinel: no more segments
+
+
+class SpokenResponsePipeline:
+    """Speak a streamed assistant reply sentence by sentence.
+
+    Text chunks are split into segments as they arrive. A synthesis task turns
+    each segment into audio while earlier segments are still playing, so the
+    first sound follows the first complete sentence rather than the whole
+    reply. Both stages hold at most `max_pending` segments; when playback
+    falls behind, feed() waits, which in turn slows consumption of the LLM
+    stream. cancel() drops everything in flight and stops playback.
+    """
+
+    def __init__(
+        self,
+        tts: TextToSpeechProvider,
+        output: AudioOutputProvider,
+        max_pending: int = 2,
+        segmenter: Optional[SentenceSegmenter] = None,
+    ):
+        self._tts = tts
+        self._output = output
+        self._max_pending = max_pending
+        self._segmenter = segmenter or SentenceSegmenter()
+        self._segments: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._clips: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._tasks = [
+            asyncio.ensure_future(self._synthesize_loop()),
+            asyncio.ensure_future(self._playback_loop()),
+        ]
+        self._cancelled = False
+
+    async def feed(self, text: str) -> None:
+        """Add a streamed text chunk; waits while the pipeline is full"""
+        for segment in self._segmenter.feed(text):
+            await self._put(self._segments, segment)
+
+    async def finish(self) -> None:
+        """Speak any remaining text and wait for playback to complete"""
+        tail = self._segmenter.flush()
+        if tail:
+            await self._put(self._segments, tail)
+        await self._put(self._segments, _END)
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def speak(self, text_stream: AsyncIterator[str]) -> AsyncIterator[str]:
+        """Speak a text stream while passing its chunks through to the caller"""
+        try:
+            async for chunk in text_stream:
+                await self.feed(chunk)
+                yield chunk
+            await self.finish()
+        except BaseException:
+            self.cancel()
+            raise
+
+    def cancel(self) -> None:
+        """Stop speaking immediately and discard queued segments"""
+        if self._cancelled:
+            return
+        self._cancelled = True
+        for task in self._tasks:
+            task.cancel()
+        self._segmenter.reset()
+        for queue in (self._segments, self._clips):
+            while not queue.empty():
+                queue.get_nowait()
+        self._output.stop_playback()
+
+    async def _put(self, queue: asyncio.Queue, item) -> None:
+        if not self._cancelled:
+            await queue.put(item)
+
+    async def _synthesize_loop(self) -> None:
+        while True:
+            segment = await self._segments.get()
+            if segment is _END:
+                await self._clips.put(_END)
+                return
+            try:
+                audio = await self._tts.synthesize(segment)
+            except Exception as e:
+                print(f"!!! Error synthesizing segment: {e}")
+                print(traceback.format_exc())
+                continue
+            if audio:
+                await self._clips.put(audio)
+
+    async def _playback_loop(self) -> None:
+        playing = deque()
+        try:
+            while True:
+                clip = await self._clips.get()
+                if clip is _END:
+                    break
+                # Queue the next clip before the current one ends to avoid gaps
+                playing.append(self._output.play_audio(io.BytesIO(clip)))
+                if len(playing) >= self._max_pending:
+                    await self._wait(playing.popleft())
+            while playing:
+                await self._wait(playing.popleft())
+        except asyncio.CancelledError:
+            for future in playing:
+                future.cancel()
+            raise
+
+    async def _wait(self, future) -> None:
+        try:
+            await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if self._cancelled or not future.cancelled():
+                raise  # We were cancelled, not just the clip
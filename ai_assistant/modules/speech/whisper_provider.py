@@ -1,49 +1,240 @@
-import whisper
-from typing import AsyncIterator
+import asyncio
+import string
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, List
 import numpy as np
-from core.interfaces.speech import SpeechToTextProvider
+import soundfile as sf
+from core.interfaces.speech import SpeechToTextProvider, TranscriptHypothesis
 from core.events import EventBus, Event, EventType
-from scipy import signal
+from utils.vad import EnergyVAD, VADEventType, speech_segments
+from utils.resampler import StreamingResampler
+from utils.transcript import HypothesisTracker
+from .whisper_worker import WhisperInferenceExecutor
+
+_PUNCTUATION = string.punctuation + "…“”‘’"
+
+
+@dataclass
+class Word:
+    text: str
+    start: float  # Seconds from the start of the stream
+    end: float
+
+    @property
+    def key(self) -> str:
+        """Comparison form: lowercase without surrounding punctuation"""
+        return self.text.strip().strip(_PUNCTUATION).lower()
+
+
+class HypothesisBuffer:
+    """Commit words once two consecutive decodes agree on them.
+
+    Each decode of the uncommitted audio produces a word hypothesis. The
+    longest common prefix of this and the previous hypothesis is stable and
+    gets committed; the rest stays pending until the next decode.
+    """
+
+    def __init__(self):
+        self.committed: List[Word] = []
+        self.pending: List[Word] = []
+        self.committed_end = 0.0
+
+    def insert(self, words: List[Word]) -> List[Word]:
+        """Add a new hypothesis and return the words it commits"""
+        # Skip words from audio that was already committed
+        words = [w for w in words if w.end > self.committed_end + 0.05]
+        words = self._drop_repeated_tail(words)
+
+        agreed = 0
+        for previous, current in zip(self.pending, words):
+            if previous.key != current.key:
+                break
+            agreed += 1
+        return self._commit(words[:agreed], words[agreed:])
+
+    def flush(self) -> List[Word]:
+        """Commit everything still pending"""
+        return self._commit(self.pending, [])
+
+    def prompt(self, max_chars: int) -> str:
+        """Tail of the committed text, used to condition the next decode"""
+        return "".join(w.text for w in self.committed)[-max_chars:].strip()
+
+    def _commit(self, words: List[Word], pending: List[Word]) -> List[Word]:
+        self.pending = pending
+        if words:
+            self.committed.extend(words)
+            self.committed_end = words[-1].end
+        return words
+
+    def _drop_repeated_tail(self, words: List[Word]) -> List[Word]:
+        # The prompt sometimes makes Whisper repeat the last committed words
+        # right at the start of the window
+        if not words or not self.committed:
+            return words
+        if words[0].start - self.committed_end > 1.0:
+            return words
+        for n in range(min(5, len(words), len(self.committed)), 0, -1):
+            tail = [w.key for w in self.committed[-n:]]
+            if [w.key for w in words[:n]] == tail:
+                return words[n:]
+        return words
 
 
 class WhisperProvider(SpeechToTextProvider):
     def __init__(self, model_name: str = "base"):
         print(f"Initializing Whisper with model: {model_name}")
-        self.model = whisper.load_model(model_name)
+        # The model lives in worker processes so inference never blocks the UI
+        self._model_name = model_name
+        self._workers = 1
+        self._backend = "float32"  # or "int8" for quantized CPU inference
+        self._threads = None  # Torch threads per worker, torch default if None
+        # Beam search at temperature 0, then sampling at each fallback
+        # temperature when the output looks degenerate
+        self._decode_options = {
+            "beam_size": None,
+            "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        }
+        self._executor = None
+        self._warm_up_task = None
+        self._ready = False
         self._event_bus = EventBus.get_instance()
-        self._buffer = []  # Store chunks as list instead of bytearray
+        self._resampler = None
         self._target_sample_rate = 16000  # Whisper expects 16kHz
         self._source_sample_rate = None  # Will be set from first chunk
+        self._sample_dtype = np.float32
+        self._vad_config = {}
+        self._vad = None
+        self._step_seconds = 1.0  # New audio between decodes
+        self._max_window_seconds = 15.0  # Force a commit past this
+        self._prompt_chars = 200
+        self._batch_size = 8  # Speech segments per forward pass in file mode
+        self._language = None
+
+    def configure(self, config: dict):
+        """Configure provider options from the speech config"""
+        print(f"\n=== Configuring Whisper with: {config} ===")
+        self._model_name = config.get("model", self._model_name)
+        self._workers = config.get("workers", self._workers)
+        self._backend = config.get("backend", self._backend)
+        self._threads = config.get("threads", self._threads)
+        if "beam_size" in config:
+            self._decode_options["beam_size"] = config["beam_size"]
+        if "temperature" in config:
+            temperature = config["temperature"]
+            if isinstance(temperature, (int, float)):
+                temperature = [temperature]
+            self._decode_options["temperature"] = tuple(temperature)
+        self._vad_config = config.get("vad", {}) or {}
+        print(f">>> VAD enabled: {bool(self._vad_config.get('enabled'))}")
+        streaming = config.get("streaming", {}) or {}
+        self._step_seconds = streaming.get("step", self._step_seconds)
+        self._max_window_seconds = streaming.get("max_window", self._max_window_seconds)
+        self._prompt_chars = streaming.get("prompt_chars", self._prompt_chars)
+        self._language = config.get("language", self._language)
+        self._batch_size = config.get("batch_size", self._batch_size)
+
+    def set_input_format(self, sample_rate: int, sample_format: str) -> None:
+        """Use the capture format reported by the audio provider"""
+        print(f">>> Whisper input format: {sample_rate}Hz {sample_format}")
+        self._source_sample_rate = sample_rate
+        self._sample_dtype = np.dtype(sample_format)
+        self._resampler = None
+        self._vad = None
+        if sample_rate == self._target_sample_rate:
+            print(">>> Capture already at 16kHz, resampling skipped")
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready
+
+    async def warm_up(self) -> None:
+        """Load and warm the model in the background; safe to call repeatedly"""
+        await asyncio.shield(self._start_warm_up())
+
+    def _start_warm_up(self) -> asyncio.Task:
+        if self._warm_up_task is None:
+            self._warm_up_task = asyncio.ensure_future(self._load_model())
+        return self._warm_up_task
+
+    async def _load_model(self) -> None:
+        start = time.monotonic()
+        print(f">>> Loading Whisper model '{self._model_name}' in the background")
+        try:
+            await self._get_executor().warm_up()
+        except Exception as e:
+            print(f"!!! Failed to load Whisper model '{self._model_name}': {e}")
+            await self._event_bus.emit(Event(EventType.ERROR, error=e))
+            raise
+        self._ready = True
+        print(f">>> Whisper model ready after {time.monotonic() - start:.1f}s")
+        if self.publish_events:
+            await self._event_bus.emit(
+                Event(
+                    EventType.SPEECH_MODEL_READY,
+                    data={"provider": "whisper", "model": self._model_name},
+                )
+            )
 
     def _resample_audio(
         self, audio_data: np.ndarray, orig_sr: int, target_sr: int
     ) -> np.ndarray:
-        """Resample audio data to target sample rate"""
-        if orig_sr == target_sr:
+        """Resample a complete buffer to the target sample rate"""
+        if not orig_sr or orig_sr == target_sr:
             return audio_data
 
         print(f"Resampling from {orig_sr}Hz to {target_sr}Hz")
-        # Calculate resampling ratio
-        ratio = target_sr / orig_sr
-        target_length = int(len(audio_data) * ratio)
-
-        # Resample using scipy's resample function
-        resampled = signal.resample(audio_data, target_length)
-        return resampled
+        return StreamingResampler(orig_sr, target_sr).resample(audio_data)
 
     async def transcribe_stream(
         self, audio_stream: AsyncIterator[bytes]
     ) -> AsyncIterator[str]:
+        """Yield committed text only; see stream_hypotheses() for partials"""
+        async for hypothesis in self.stream_hypotheses(audio_stream):
+            if hypothesis.is_final:
+                yield hypothesis.text
+
+    async def stream_hypotheses(
+        self, audio_stream: AsyncIterator[bytes]
+    ) -> AsyncIterator[TranscriptHypothesis]:
+        """Yield partial and final text, publishing each as TRANSCRIPTION_RESULT"""
+        tracker = HypothesisTracker()
+        async for hypothesis in self._slide_window(audio_stream):
+            hypothesis = tracker.track(hypothesis)
+            if self.publish_events:
+                await self._event_bus.emit(
+                    Event(EventType.TRANSCRIPTION_RESULT, data=hypothesis)
+                )
+            yield hypothesis
+
+    async def _slide_window(
+        self, audio_stream: AsyncIterator[bytes]
+    ) -> AsyncIterator[TranscriptHypothesis]:
+        """Transcribe with a sliding window, yielding partial and final text.
+
+        Only the audio after the last committed word is decoded, with the
+        committed text as the prompt. Words are committed (final) once two
+        consecutive decodes agree on them; the window then slides past them.
+        The remaining words are yielded as a partial hypothesis.
+        """
         print("\n=== Starting new transcription stream ===")
+        self._start_warm_up()
+        rate = self._target_sample_rate
+        step = int(self._step_seconds * rate)
+        hypotheses = HypothesisBuffer()
+        window = np.empty(0, dtype=np.float32)  # Uncommitted audio at 16kHz
+        window_start = 0.0  # Stream time of window[0]
+        new_chunks = []
+        new_samples = 0
+        speech_seen = False
+        speech_ended = False  # A SPEECH_END since the last decode
+
         try:
             async for chunk in audio_stream:
-                print(f"\nReceived audio chunk: {len(chunk)} bytes")
-                # Convert chunk to numpy array and store
-                chunk_data = np.frombuffer(chunk, dtype=np.float32)
-                print(f"Converted to numpy array: {len(chunk_data)} samples")
-                print(
-                    f"Audio range: min={np.min(chunk_data):.3f}, max={np.max(chunk_data):.3f}"
-                )
+                chunk_data = np.frombuffer(chunk, dtype=self._sample_dtype)
+                if chunk_data.dtype == np.int16:
+                    chunk_data = chunk_data.astype(np.float32) / 32768.0
 
                 # Set source sample rate from first chunk if not set
                 if self._source_sample_rate is None:
@@ -54,62 +245,159 @@ class WhisperProvider(SpeechToTextProvider):
                         f"\n>>> Detected source sample rate: {self._source_sample_rate}Hz"
                     )
 
-                self._buffer.append(chunk_data)
-                total_samples = sum(len(chunk) for chunk in self._buffer)
-                print(
-                    f"Buffer size: {total_samples} samples ({len(self._buffer)} chunks)"
-                )
-
-                # Process if we have enough audio (2 seconds at source rate)
-                min_samples = int(self._source_sample_rate * 2)  # 2 seconds of audio
-                if total_samples >= min_samples:
-                    print(f"\n=== Processing buffer with {total_samples} samples ===")
-                    # Concatenate all chunks
-                    audio_data = np.concatenate(self._buffer)
-                    print(f"Concatenated audio: {len(audio_data)} samples")
-
-                    # Ensure audio is in [-1, 1] range
-                    max_val = np.max(np.abs(audio_data))
-                    if max_val > 1.0:
-                        print(f"Normalizing audio from max value of {max_val}")
-                        audio_data = audio_data / max_val
-                        print(
-                            f"After normalization: min={np.min(audio_data):.3f}, max={np.max(audio_data):.3f}"
+                # Track speech so silent steps can skip inference
+                if self._vad_config.get("enabled"):
+                    if self._vad is None:
+                        self._vad = EnergyVAD.from_config(
+                            self._source_sample_rate, self._vad_config
                         )
-
-                    # Resample to 16kHz for Whisper
-                    audio_data = self._resample_audio(
-                        audio_data, self._source_sample_rate, self._target_sample_rate
+                    events = self._vad.process(chunk_data)
+                    speech_seen |= self._vad.is_speech or bool(events)
+                    speech_ended |= any(
+                        event.type == VADEventType.SPEECH_END for event in events
                     )
-                    print(
-                        f"After resampling: {len(audio_data)} samples at {self._target_sample_rate}Hz"
+
+                # Resample each chunk as it arrives; filter state carries over
+                if self._resampler is None:
+                    self._resampler = StreamingResampler(
+                        self._source_sample_rate, self._target_sample_rate
                     )
+                resampled = self._resampler.process(chunk_data)
+                new_chunks.append(resampled)
+                new_samples += len(resampled)
+                if new_samples < step:
+                    continue
+
+                window = np.concatenate([window] + new_chunks)
+                new_chunks = []
+                new_samples = 0
+                if not self._ready:
+                    if self._warm_up_task.done():
+                        self._warm_up_task.result()  # Raises the load error
+                    # Keep buffering until the model has loaded, but only
+                    # the most recent max_window of audio
+                    limit = int(self._max_window_seconds * rate)
+                    if len(window) > limit:
+                        window_start += (len(window) - limit) / rate
+                        window = window[-limit:]
+                    continue
+
+                if self._vad is not None and not speech_seen:
+                    if not hypotheses.pending:
+                        # Nothing to revise; slide over the silence
+                        keep = min(len(window), step)
+                        window_start += (len(window) - keep) / rate
+                        window = window[-keep:]
+                    speech_seen = self._vad.is_speech
+                    continue
+                if self._vad is not None:
+                    speech_seen = self._vad.is_speech
+
+                committed = hypotheses.insert(
+                    await self._decode(window, window_start, hypotheses)
+                )
+                # Silence follows a speech end, so no later decode would
+                # confirm the last words; this decode saw all of them
+                utterance_done = speech_ended and not self._vad.is_speech
+                speech_ended = False
+                if utterance_done or len(window) / rate > self._max_window_seconds:
+                    committed += hypotheses.flush()
+
+                for hypothesis in self._emit(committed, hypotheses.pending):
+                    yield hypothesis
 
-                    try:
-                        print("\n>>> Sending to Whisper for transcription...")
-                        result = self.model.transcribe(audio_data)
-                        text = result["text"].strip()
-                        if text:
-                            print(f">>> Transcribed text: '{text}'")
-                            yield text
-                        else:
-                            print(">>> No text transcribed from audio segment")
-                    except Exception as e:
-                        print(f"!!! Error during transcription: {e}")
-                        continue
-
-                    # Keep last 0.5 seconds for overlap
-                    overlap_samples = int(self._source_sample_rate * 0.5)
-                    last_chunk = np.concatenate(self._buffer)[-overlap_samples:]
-                    self._buffer = [last_chunk]
-                    print(f"Keeping {len(last_chunk)} samples for overlap")
+                # Slide the window past everything committed
+                if hypotheses.committed_end > window_start:
+                    cut = int((hypotheses.committed_end - window_start) * rate)
+                    window = window[cut:]
+                    window_start += cut / rate
+                if len(window) / rate > self._max_window_seconds:
+                    cut = len(window) - step
+                    window = window[cut:]
+                    window_start += cut / rate
+
+            # Stream ended: decode what's left and commit all of it
+            await self.warm_up()
+            window = np.concatenate([window] + new_chunks)
+            committed = []
+            if len(window) >= rate // 4:
+                committed = hypotheses.insert(
+                    await self._decode(window, window_start, hypotheses)
+                )
+            for hypothesis in self._emit(committed + hypotheses.flush(), []):
+                yield hypothesis
 
         except Exception as e:
             print(f"!!! Error in transcribe_stream: {e}")
             raise
 
+    def _get_executor(self) -> WhisperInferenceExecutor:
+        if self._executor is None:
+            self._executor = WhisperInferenceExecutor(
+                self._model_name, self._workers, self._backend, self._threads
+            )
+        return self._executor
+
+    def close(self) -> None:
+        """Stop the inference workers"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def _decode(
+        self, audio: np.ndarray, offset: float, hypotheses: HypothesisBuffer
+    ) -> List[Word]:
+        """Run Whisper on the window and return words in stream time"""
+        # Ensure audio is in [-1, 1] range
+        max_val = np.max(np.abs(audio)) if len(audio) else 0.0
+        if max_val > 1.0:
+            audio = audio / max_val
+
+        try:
+            result = await self._get_executor().transcribe(
+                audio,
+                word_timestamps=True,
+                initial_prompt=hypotheses.prompt(self._prompt_chars) or None,
+                condition_on_previous_text=False,
+                language=self._language,
+                fp16=False,
+                **self._decode_options,
+            )
+        except Exception as e:
+            print(f"!!! Error during transcription: {e}")
+            return []
+
+        return [
+            Word(word["word"], offset + word["start"], offset + word["end"])
+            for segment in result.get("segments", [])
+            for word in segment.get("words", [])
+        ]
+
+    @staticmethod
+    def _emit(committed: List[Word], pending: List[Word]) -> List[TranscriptHypothesis]:
+        hypotheses = []
+        if committed:
+            text = "".join(w.text for w in committed).strip()
+            print(f">>> Committed: '{text}'")
+            hypotheses.append(
+                TranscriptHypothesis(
+                    text, True, start=committed[0].start, end=committed[-1].end
+                )
+            )
+        if pending:
+            hypotheses.append(
+                TranscriptHypothesis(
+                    "".join(w.text for w in pending).strip(),
+                    False,
+                    start=pending[0].start,
+                    end=pending[-1].end,
+                )
+            )
+        return hypotheses
+
     async def transcribe_file(self, audio_file: bytes) -> str:
         try:
+            await self.warm_up()
             audio_data = np.frombuffer(audio_file, dtype=np.float32)
             if np.max(np.abs(audio_data)) > 1.0:
                 audio_data = np.clip(audio_data, -1.0, 1.0)
@@ -119,8 +407,88 @@ class WhisperProvider(SpeechToTextProvider):
                 audio_data, self._source_sample_rate, self._target_sample_rate
             )
 
-            result = self.model.transcribe(audio_data)
-            return result["text"]
+            segments = await self.transcribe_segments(audio_data)
+            return " ".join(segment.text for segment in segments)
         except Exception as e:
             print(f"Error in transcribe_file: {e}")
             raise
+
+    async def transcribe_recording(self, path: str) -> List[TranscriptHypothesis]:
+        """Transcribe an audio file on disk into timestamped segments"""
+        audio, sample_rate = sf.read(path, dtype="float32", always_2d=True)
+        audio = self._resample_audio(
+            audio.mean(axis=1), sample_rate, self._target_sample_rate
+        )
+        return await self.transcribe_segments(audio)
+
+    async def transcribe_segments(
+        self, audio: np.ndarray
+    ) -> List[TranscriptHypothesis]:
+        """Transcribe a complete 16kHz recording in batched segments.
+
+        With VAD enabled, silence is never sent to the model: the recording
+        is cut at pauses and only the speech spans are decoded. Otherwise it
+        is cut into Whisper's 30 s windows. Segments that decode badly are
+        retried at each fallback temperature in turn, like whisper.transcribe.
+        """
+        await self.warm_up()
+        rate = self._target_sample_rate
+        if self._vad_config.get("enabled"):
+            spans = speech_segments(audio, rate, self._vad_config)
+        else:
+            window = 30 * rate
+            spans = [
+                (start, min(start + window, len(audio)))
+                for start in range(0, len(audio), window)
+            ]
+        if not spans:
+            return []
+
+        results = [None] * len(spans)
+        retry = list(range(len(spans)))
+        for temperature in self._decode_options["temperature"]:
+            options = {"temperature": temperature}
+            if temperature == 0:
+                # Beam search only applies to the deterministic first pass
+                options["beam_size"] = self._decode_options["beam_size"]
+            decoded = await self._get_executor().transcribe_batch(
+                audio,
+                [spans[i] for i in retry],
+                self._batch_size,
+                language=self._language,
+                fp16=False,
+                without_timestamps=True,
+                **options,
+            )
+            for i, result in zip(retry, decoded):
+                results[i] = result
+            retry = [i for i in retry if self._needs_fallback(results[i])]
+            if not retry:
+                break
+
+        segments = []
+        for result in results:
+            if self._is_silence(result):
+                continue
+            if result["text"]:
+                segments.append(
+                    TranscriptHypothesis(
+                        result["text"],
+                        is_final=True,
+                        start=result["start"] / rate,
+                        end=result["end"] / rate,
+                    )
+                )
+        return segments
+
+    @staticmethod
+    def _is_silence(result: dict) -> bool:
+        # Whisper's own silence rule: likely no speech and low confidence
+        return result["no_speech_prob"] > 0.6 and result["avg_logprob"] < -1.0
+
+    @classmethod
+    def _needs_fallback(cls, result: dict) -> bool:
+        """Whisper's thresholds for a repetitive or low-confidence decode"""
+        if cls._is_silence(result):
+            return False
+        return result["compression_ratio"] > 2.4 or result["avg_logprob"] < -1.0
@@ -0,0 +1,252 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+import numpy as np
+
+_model = None  # Loaded once per worker process
+_ready_barrier = None  # Shared by the pool's workers, see _ping()
+BACKENDS = ("float32", "int8")
+
+
+def _load_model(model_name: str):
+    """Load a Whisper model, memory-mapping the checkpoint where possible.
+
+    With mmap the weights are paged in from the file (and shared through the
+    page cache between workers) instead of being read into private memory.
+    Falls back to whisper.load_model() for custom paths or older torch.
+    """
+    import torch
+    import whisper
+    from whisper.model import ModelDimensions, Whisper
+
+    try:
+        path = whisper._download(
+            whisper._MODELS[model_name],
+            os.path.join(
+                os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "whisper"
+            ),
+            False,
+        )
+        checkpoint = torch.load(path, map_location="cpu", mmap=True)
+        model = Whisper(ModelDimensions(**checkpoint["dims"]))
+        model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+        model.set_alignment_heads(whisper._ALIGNMENT_HEADS[model_name])
+        print(f">>> Whisper model '{model_name}' memory-mapped from {path}")
+        return model
+    except (KeyError, TypeError, RuntimeError, AttributeError) as e:
+        print(f">>> Memory-mapped load unavailable ({e}), loading normally")
+        return whisper.load_model(model_name, device="cpu")
+
+
+def _quantize_int8(model):
+    """Dynamically quantize every Linear layer to int8 weights.
+
+    The attention and MLP projections hold nearly all of Whisper's weights and
+    FLOPs, so this roughly quarters their memory and runs them through the
+    int8 GEMM kernels. Whisper's Linear subclass only adds a dtype cast that
+    is a no-op in float32, so it is swapped for nn.Linear, which is what
+    quantize_dynamic() recognises.
+    """
+    import torch
+    from torch import nn
+
+    for module in model.modules():
+        if isinstance(module, nn.Linear):
+            module.__class__ = nn.Linear
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def _init_worker(
+    model_name: str, backend: str, threads: Optional[int], ready_barrier
+) -> None:
+    global _model, _ready_barrier
+    _ready_barrier = ready_barrier
+    import torch
+
+    if threads:
+        torch.set_num_threads(threads)
+    print(
+        f">>> Whisper worker loading model: {model_name} "
+        f"({backend}, {torch.get_num_threads()} threads)"
+    )
+    _model = _load_model(model_name)
+    if backend == "int8":
+        _model = _quantize_int8(_model)
+    # One throwaway decode so the first real request doesn't pay the
+    # allocation and kernel warm-up
+    _model.transcribe(np.zeros(16000, dtype=np.float32), fp16=False)
+    print(">>> Whisper worker ready")
+
+
+def _ping() -> int:
+    # A worker only runs this after its initializer has loaded the model.
+    # Holding each ping until every worker has one means no single worker
+    # can answer them all, so one ping per worker proves each is warm.
+    _ready_barrier.wait()
+    return os.getpid()
+
+
+def _transcribe(shm_name: str, samples: int, options: dict) -> dict:
+    # Spawned workers share the parent's resource tracker, and the parent
+    # unlinks the block once the job is done
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        audio = np.ndarray((samples,), dtype=np.float32, buffer=shm.buf)
+        result = _model.transcribe(audio, **options)
+        del audio  # Drop the view before the block is closed
+        return result
+    finally:
+        shm.close()
+
+
+def _transcribe_batch(
+    shm_name: str,
+    samples: int,
+    spans: List[Tuple[int, int]],
+    batch_size: int,
+    options: dict,
+) -> List[dict]:
+    """Decode speech spans in padded batches, one forward pass per batch"""
+    import torch
+    import whisper
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        audio = np.ndarray((samples,), dtype=np.float32, buffer=shm.buf)
+        decode_options = whisper.DecodingOptions(**options)
+        results = []
+        for i in range(0, len(spans), batch_size):
+            batch = spans[i : i + batch_size]
+            # Every span is padded to Whisper's 30 s input, so they stack
+            mel = torch.stack(
+                [
+                    whisper.log_mel_spectrogram(
+                        whisper.pad_or_trim(audio[start:end].copy()),
+                        _model.dims.n_mels,
+                    )
+                    for start, end in batch
+                ]
+            )
+            for (start, end), result in zip(
+                batch, whisper.decode(_model, mel, decode_options)
+            ):
+                results.append(
+                    {
+                        "start": start,
+                        "end": end,
+                        "text": result.text.strip(),
+                        "avg_logprob": result.avg_logprob,
+                        "no_speech_prob": result.no_speech_prob,
+                        "compression_ratio": result.compression_ratio,
+                    }
+                )
+        del audio
+        return results
+    finally:
+        shm.close()
+
+
+class WhisperInferenceExecutor:
+    """Whisper inference in worker processes, awaitable from the event loop.
+
+    Each worker loads the model once. Audio goes to the worker through a
+    shared memory block instead of being pickled; the block is released when
+    the job finishes, even if the awaiting coroutine was cancelled first.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "base",
+        workers: int = 1,
+        backend: str = "float32",
+        threads: Optional[int] = None,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown Whisper backend: {backend}")
+        self._model_name = model_name
+        self._workers = workers
+        self._backend = backend
+        self._threads = threads
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        if self._pool is not None:
+            return
+        print(
+            f">>> Starting {self._workers} Whisper worker(s) for "
+            f"'{self._model_name}' ({self._backend})"
+        )
+        # Fork would copy the Qt/PortAudio state into the worker
+        context = multiprocessing.get_context("spawn")
+        self._pool = ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(
+                self._model_name,
+                self._backend,
+                self._threads,
+                context.Barrier(self._workers),
+            ),
+        )
+
+    def submit(self, audio: np.ndarray, **options) -> Future:
+        """Queue a transcription and return a concurrent Future for its result"""
+        return self._submit(_transcribe, audio, options)
+
+    def submit_batch(
+        self,
+        audio: np.ndarray,
+        spans: List[Tuple[int, int]],
+        batch_size: int = 8,
+        **options,
+    ) -> Future:
+        """Queue batched decoding of (start, end) sample spans of one recording.
+
+        `options` are whisper.DecodingOptions fields; the result is a list of
+        dicts with start, end, text, avg_logprob and no_speech_prob per span.
+        """
+        return self._submit(_transcribe_batch, audio, spans, batch_size, options)
+
+    def _submit(self, fn, audio: np.ndarray, *args) -> Future:
+        self.start()
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        shm = shared_memory.SharedMemory(create=True, size=max(audio.nbytes, 1))
+        np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+
+        def release(_):
+            shm.close()
+            shm.unlink()
+
+        future = self._pool.submit(fn, shm.name, len(audio), *args)
+        future.add_done_callback(release)
+        return future
+
+    async def warm_up(self) -> None:
+        """Start every worker and wait until each has loaded and warmed its model"""
+        self.start()
+        futures = [self._pool.submit(_ping) for _ in range(self._workers)]
+        await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+
+    async def transcribe(self, audio: np.ndarray, **options) -> dict:
+        """Transcribe without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(audio, **options))
+
+    async def transcribe_batch(
+        self,
+        audio: np.ndarray,
+        spans: List[Tuple[int, int]],
+        batch_size: int = 8,
+        **options,
+    ) -> List[dict]:
+        return await asyncio.wrap_future(
+            self.submit_batch(audio, spans, batch_size, **options)
+        )
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,28 @@
+from enum import Enum
+from typing import Dict, Any
+from core.interfaces.speech import TextToSpeechProvider
+from .pyttsx3_provider import Pyttsx3Provider
+
+
+class TTSProviderType(Enum):
+    PYTTSX3 = "pyttsx3"
+
+
+def create_tts_provider(
+    provider_type: str, config: Dict[str, Any] = None
+) -> TextToSpeechProvider:
+    """Create and configure a text-to-speech provider"""
+    providers = {
+        "pyttsx3": Pyttsx3Provider,
+    }
+
+    if provider_type not in providers:
+        raise ValueError(f"Unknown TTS provider type: {provider_type}")
+
+    provider = providers[provider_type]()
+
+    # Configure the provider if it has a configure method
+    if hasattr(provider, "configure") and config:
+        provider.configure(config)
+
+    return provider
@@ -0,0 +1,122 @@
+import asyncio
+import io
+import os
+import tempfile
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Optional
+import numpy as np
+import pyttsx3
+import soundfile as sf
+from core.interfaces.audio import AudioConfig
+from core.interfaces.speech import TextToSpeechProvider
+from utils.resampler import StreamingResampler
+from utils.text_segmenter import SentenceSegmenter
+
+
+class Pyttsx3Provider(TextToSpeechProvider):
+    """Offline text-to-speech using the platform engine (eSpeak, SAPI5, NSSS).
+
+    Nothing leaves the machine. The pyttsx3 engine isn't thread-safe, so it
+    lives on a single worker thread and every render runs there. Output is
+    converted to mono int16 at the configured sample rate, so callers can
+    open playback before the first render finishes.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+        self._engine = None
+        self._voice: Optional[str] = None
+        self._rate: Optional[int] = None  # Words per minute, engine default if None
+        self._volume = 1.0
+        self._sample_rate = 22050
+        self._block_size = 2048
+        print(">>> pyttsx3 TTS provider created")
+
+    def configure(self, config: dict):
+        """Configure provider options from the tts config"""
+        print(f"\n=== Configuring pyttsx3 with: {config} ===")
+        self._voice = config.get("voice", self._voice)
+        self._rate = config.get("rate", self._rate)
+        self._volume = config.get("volume", self._volume)
+        self._sample_rate = config.get("sample_rate", self._sample_rate)
+        self._block_size = config.get("block_size", self._block_size)
+
+    def get_output_config(self) -> AudioConfig:
+        return AudioConfig(
+            sample_rate=self._sample_rate,
+            channels=1,
+            chunk_size=self._block_size,
+            sample_format="int16",
+        )
+
+    async def synthesize(self, text: str) -> bytes:
+        loop = asyncio.get_running_loop()
+        pcm = await loop.run_in_executor(self._executor, self._render, text)
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self._sample_rate)
+            wf.writeframes(pcm.tobytes())
+        return buffer.getvalue()
+
+    async def synthesize_stream(self, text: str) -> AsyncIterator[bytes]:
+        """Render sentence by sentence, yielding each one's PCM blocks.
+
+        The engine can't stream within an utterance, so the next sentence is
+        rendered while the current one is being consumed.
+        """
+        loop = asyncio.get_running_loop()
+        segmenter = SentenceSegmenter()
+        segments = iter(segmenter.feed(text) + [segmenter.flush()])
+        pending = deque()
+
+        def submit_next():
+            for segment in segments:
+                if segment:
+                    pending.append(
+                        loop.run_in_executor(self._executor, self._render, segment)
+                    )
+                    return
+
+        submit_next()
+        try:
+            while pending:
+                pcm = await pending.popleft()
+                submit_next()
+                for start in range(0, len(pcm), self._block_size):
+                    yield pcm[start : start + self._block_size].tobytes()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _get_engine(self):
+        if self._engine is None:
+            self._engine = pyttsx3.init()
+            if self._voice:
+                self._engine.setProperty("voice", self._voice)
+            if self._rate:
+                self._engine.setProperty("rate", self._rate)
+            self._engine.setProperty("volume", self._volume)
+            print(">>> pyttsx3 engine initialized")
+        return self._engine
+
+    def _render(self, text: str) -> np.ndarray:
+        """Synthesize one utterance to mono int16 at the output rate"""
+        engine = self._get_engine()
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            engine.save_to_file(text, path)
+            engine.runAndWait()
+            audio, rate = sf.read(path, dtype="float32", always_2d=True)
+        finally:
+            os.remove(path)
+
+        audio = audio.mean(axis=1)
+        if rate != self._sample_rate:
+            audio = StreamingResampler(rate, self._sample_rate).resample(audio)
+        return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
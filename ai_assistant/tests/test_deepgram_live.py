@@ -0,0 +1,80 @@
+import asyncio
+import json
+import numpy as np
+import pytest
+
+websockets = pytest.importorskip("websockets")
+
+from modules.speech.deepgram_live import DeepgramLiveSession  # noqa: E402
+
+RATE = 16000
+FRAME_SECONDS = 0.1
+FRAME_SAMPLES = int(RATE * FRAME_SECONDS)
+
+
+def frame(index: int) -> bytes:
+    """A frame whose samples all hold its index, so the server can tell them apart"""
+    return np.full(FRAME_SAMPLES, index, dtype=np.int16).tobytes()
+
+
+def result(start: float, duration: float, text: str) -> str:
+    return json.dumps(
+        {
+            "type": "Results",
+            "start": start,
+            "duration": duration,
+            "is_final": True,
+            "channel": {"alternatives": [{"transcript": text}]},
+        }
+    )
+
+
+def test_dropped_connection_replays_unacknowledged_audio():
+    connections = []
+
+    async def handler(ws):
+        received = []
+        connections.append(received)
+        async for message in ws:
+            if isinstance(message, str):
+                if json.loads(message)["type"] == "CloseStream":
+                    # Everything this connection heard, on its own clock
+                    await ws.send(result(0.0, len(received) * FRAME_SECONDS, "b"))
+                    return
+                continue
+            received.append(int(np.frombuffer(message, dtype=np.int16)[0]))
+            if len(connections) == 1 and len(received) == 5:
+                # Acknowledge frames 0-2, then drop the connection
+                await ws.send(result(0.0, 3 * FRAME_SECONDS, "a"))
+                return
+
+    async def audio():
+        for index in range(12):
+            yield frame(index)
+            await asyncio.sleep(0.02)
+
+    async def run():
+        async with websockets.serve(
+            handler, "127.0.0.1", 0, subprotocols=["token"]
+        ) as server:
+            port = server.sockets[0].getsockname()[1]
+            session = DeepgramLiveSession(
+                "key", url=f"ws://127.0.0.1:{port}", sample_rate=RATE
+            )
+            return [hypothesis async for hypothesis in session.run(audio())]
+
+    hypotheses = asyncio.run(asyncio.wait_for(run(), timeout=10))
+
+    assert len(connections) == 2
+    first, second = connections
+    assert first == [0, 1, 2, 3, 4]
+    # The replay starts at the first unacknowledged frame; nothing is lost
+    # or repeated
+    assert second == list(range(3, 12))
+
+    # Timestamps on the second connection continue in stream time
+    assert [h.text for h in hypotheses] == ["a", "b"]
+    assert hypotheses[0].start == pytest.approx(0.0)
+    assert hypotheses[0].end == pytest.approx(0.3)
+    assert hypotheses[1].start == pytest.approx(0.3)
+    assert hypotheses[1].end == pytest.approx(1.2)
@@ -6,11 +6,17 @@ from .components.assistant_selector import AssistantSelector
 from .components.audio_controls import AudioControls
 from core.interfaces.assistant import Message, AssistantProvider
 from core.interfaces.audio import AudioInputProvider  # Add this import
-from core.interfaces.speech import SpeechToTextProvider
+from core.interfaces.speech import (
+    SpeechToTextProvider,
+    TextToSpeechProvider,
+    TranscriptHypothesis,
+)
+from modules.speech.response_pipeline import SpokenResponsePipeline
 from utils.registry import ProviderRegistry
 from core.events import EventBus, Event, EventType
 import asyncio
-from typing import Optional, AsyncIterator
+import html
+from typing import List, Optional, AsyncIterator
 from PyQt6.QtWidgets import QApplication
 
 
@@ -19,8 +25,16 @@ class ChatWindow(QMainWindow):
         super().__init__()
         self._event_bus = EventBus.get_instance()
         self._settings = QSettings("AIAssistant", "Chat")
+        self._speech_pipeline: Optional[SpokenResponsePipeline] = None
+        self._transcript: List[str] = []  # Final segments of the current dictation
         self.setup_ui()
         self.load_settings()
+        self._event_bus.subscribe(
+            EventType.SPEECH_MODEL_READY, self._on_speech_model_ready
+        )
+        self._event_bus.subscribe(EventType.TRANSCRIPTION_RESULT, self._on_transcript)
+        # Recording works right away; audio is buffered until the model is up
+        self.statusBar().showMessage("Loading speech model...")
 
     def setup_ui(self):
         self.setWindowTitle("AI Assistant")
@@ -85,7 +99,7 @@ class ChatWindow(QMainWindow):
             self.message_view.add_message(assistant_message)
 
             full_response = ""
-            async for chunk in assistant.send_message(messages):
+            async for chunk in self._speak_response(assistant.send_message(messages)):
                 full_response += chunk
                 assistant_message.content = full_response
                 # Need to implement message update mechanism
@@ -93,6 +107,46 @@ class ChatWindow(QMainWindow):
         except Exception as e:
             await self._event_bus.emit(Event(EventType.ERROR, error=e))
 
+    def _speak_response(self, text_stream: AsyncIterator[str]) -> AsyncIterator[str]:
+        """Speak the reply while it streams in, if a TTS provider is registered"""
+        self._cancel_speech()
+        registry = ProviderRegistry.get_instance()
+        try:
+            tts = registry.get_provider(TextToSpeechProvider)
+        except KeyError:
+            return text_stream
+
+        self._speech_pipeline = SpokenResponsePipeline(
+            tts, registry.get_provider(AudioInputProvider)
+        )
+        return self._speech_pipeline.speak(text_stream)
+
+    def _cancel_speech(self):
+        if self._speech_pipeline is not None:
+            self._speech_pipeline.cancel()
+            self._speech_pipeline = None
+
+    def _on_speech_model_ready(self, event: Event):
+        model = (event.data or {}).get("model")
+        message = f"Speech model {model} ready" if model else "Speech ready"
+        self.statusBar().showMessage(message, 5000)
+
+    def _on_transcript(self, event: Event):
+        """Show the final text so far plus the live partial in the input box"""
+        hypothesis: TranscriptHypothesis = event.data
+        text = hypothesis.text.strip()
+        if hypothesis.is_final:
+            if text:
+                self._transcript.append(text)
+            self.input_area.text_edit.setPlainText(" ".join(self._transcript))
+            return
+
+        final = html.escape(" ".join(self._transcript))
+        partial = html.escape(text)
+        self.input_area.text_edit.setHtml(
+            f'{final} <span style="color: gray;">{partial}</span>'
+        )
+
     def _on_model_changed(self, model: str, config: dict):
         # Update the assistant configuration
         pass
@@ -100,6 +154,7 @@ class ChatWindow(QMainWindow):
     def _on_recording_started(self):
         print("Recording started, disabling input area")
         self.input_area.setEnabled(False)
+        self._cancel_speech()  # Don't talk over the user
         # Temporarily disable transcription
         # self._start_transcription()
 
@@ -121,6 +176,15 @@ class ChatWindow(QMainWindow):
 
             if self.speech_provider:
                 print("Found speech provider, setting up transcription stream")
+                # Tell the recognizer what the capture side negotiated so it
+                # only resamples when the device couldn't deliver 16kHz
+                if hasattr(self.audio_provider, "get_stream_config"):
+                    stream_config = self.audio_provider.get_stream_config()
+                    if stream_config is not None:
+                        self.speech_provider.set_input_format(
+                            stream_config.sample_rate, stream_config.sample_format
+                        )
+                self._transcript = []
                 # Get the current event loop
                 loop = asyncio.get_event_loop()
                 # Start the transcription task
@@ -163,22 +227,13 @@ class ChatWindow(QMainWindow):
             print("Starting transcription stream processing")
             audio_iterator = AudioStreamIterator(self.audio_provider)
 
-            # Remove the await here - transcribe_stream returns an async generator
-            async for transcription in self.speech_provider.transcribe_stream(
+            # The input box follows the TRANSCRIPTION_RESULT events the
+            # provider publishes for every partial and final hypothesis
+            async for hypothesis in self.speech_provider.stream_hypotheses(
                 audio_iterator
             ):
-                if transcription.strip():
-                    print(f"\n>>> Transcription received in UI: '{transcription}'")
-
-                    # Update UI in thread-safe way
-                    try:
-                        print("Attempting to update UI...")
-                        self.input_area.text_edit.setPlainText(transcription)
-                        self.input_area.send_button.setEnabled(True)
-                        QApplication.instance().processEvents()
-                        print("UI successfully updated with transcription")
-                    except Exception as e:
-                        print(f"!!! Error updating UI: {e}")
+                if hypothesis.is_final and hypothesis.text.strip():
+                    print(f"\n>>> Transcription received in UI: '{hypothesis.text}'")
 
         except asyncio.CancelledError:
             print(">>> Transcription loop cancelled")
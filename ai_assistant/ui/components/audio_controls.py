@@ -27,6 +27,7 @@ class AudioControls(QWidget):
     recording_stopped = pyqtSignal()
     input_device_changed = pyqtSignal(int)
     output_device_changed = pyqtSignal(int)
+    playback_finished = pyqtSignal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -34,6 +35,7 @@ class AudioControls(QWidget):
             AudioInputProvider
         )
         self._recording = False
+        self.playback_finished.connect(self._on_playback_finished)
         self._setup_ui()
         self._load_devices()
         self._recordings_dir = "recordings"
@@ -188,34 +190,37 @@ class AudioControls(QWidget):
             self.play_button.setEnabled(False)
             self.record_button.setEnabled(False)
 
-            try:
-                # Open and read the test sound file
-                with open(self._test_sound_path, "rb") as f:
-                    wav_data = io.BytesIO(f.read())
+            # Open and read the test sound file
+            with open(self._test_sound_path, "rb") as f:
+                wav_data = io.BytesIO(f.read())
 
-                # Play the test sound
-                self._provider.play_audio(wav_data)
-                print(">>> Test sound completed")
-
-            finally:
-                # Re-enable buttons
-                self.test_sound_button.setEnabled(True)
-                self.play_button.setEnabled(True)
-                self.record_button.setEnabled(True)
+            # Buttons come back when the playback future resolves
+            self._watch_playback(self._provider.play_audio(wav_data))
 
         except Exception as e:
             print(f"!!! Error playing test sound: {str(e)}")
             print(traceback.format_exc())
-
-    def _save_recording(self):
-        """Save the recording to a file"""
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = os.path.join(self._recordings_dir, f"recording_{timestamp}.wav")
-            self._provider.save_recording(filename)
-        except Exception as e:
-            print(f"!!! Error saving recording: {str(e)}")
-            print(traceback.format_exc())
+            self._on_playback_finished()
+
+    def _watch_playback(self, future) -> None:
+        """Re-enable controls once playback completes or is stopped"""
+        # Done callbacks run on the audio thread; the signal hops to the UI thread
+        future.add_done_callback(lambda _: self.playback_finished.emit())
+
+    def _on_playback_finished(self):
+        print(">>> Playback completed")
+        self.test_sound_button.setEnabled(True)
+        self.play_button.setEnabled(True)
+        self.record_button.setEnabled(True)
+
+    def _new_recording_path(self) -> str:
+        """Build a timestamped path for the next recording"""
+        config = ProviderRegistry.get_instance().get_provider_config(
+            AudioInputProvider
+        )
+        extension = config.get("recording_format") or "wav"
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return os.path.join(self._recordings_dir, f"recording_{timestamp}.{extension}")
 
     def _load_devices(self):
         devices = self._provider.get_devices()
@@ -282,15 +287,29 @@ class AudioControls(QWidget):
                 input_devices = devices.get("input", [])
                 device_info = next(d for d in input_devices if d["id"] == device_id)
 
+                # Providers that negotiate formats get the configured rate as a
+                # preference; the rest open at the device default
+                sample_rate = int(device_info["sample_rate"])
+                if hasattr(self._provider, "negotiate_format"):
+                    audio_settings = (
+                        ProviderRegistry.get_instance().get_provider_config(
+                            AudioInputProvider
+                        )
+                    )
+                    sample_rate = audio_settings.get("sample_rate") or sample_rate
+
                 config = AudioConfig(
-                    sample_rate=int(device_info["sample_rate"]),
+                    sample_rate=sample_rate,
                     channels=1,
                     chunk_size=1024,
                     device_id=device_id,
+                    recording_path=self._new_recording_path(),
                 )
                 print(f">>> Audio config: {config}")
 
                 self._provider.start_stream(config)
+                if hasattr(self._provider, "get_stream_config"):
+                    print(f">>> Stream config: {self._provider.get_stream_config()}")
                 self._level_timer.start()
                 self.recording_started.emit()
 
@@ -312,14 +331,14 @@ class AudioControls(QWidget):
             self.play_button.setEnabled(False)
             self.test_sound_button.setEnabled(False)
 
-            # Stop the stream and wait for processing
+            # Stop the stream and wait for processing; the recording file is
+            # written while capturing, so only the last few blocks remain
             self._provider.stop_stream()
 
             # Wait for processing to complete
             while self._provider.is_processing():
                 QApplication.processEvents()  # Keep UI responsive
 
-            self._save_recording()  # Save the recording
             self.recording_stopped.emit()
 
             # Re-enable controls
@@ -339,22 +358,24 @@ class AudioControls(QWidget):
             print(f">>> Using output device ID: {output_device_id}")
 
             # Play the recorded audio
-            self._provider.play_audio(None)
-
-            self.play_button.setEnabled(True)
-            self.record_button.setEnabled(True)
+            self._watch_playback(self._provider.play_audio(None))
         except Exception as e:
             print(f"!!! Error playing audio: {str(e)}")
             print(traceback.format_exc())
-            self.play_button.setEnabled(True)
-            self.record_button.setEnabled(True)
+            self._on_playback_finished()
 
     def _update_audio_level(self):
         if not self._recording:
             return
 
         try:
-            chunk = self._provider.read_chunk()
+            # Providers that meter in the capture path only need sampling here
+            if hasattr(self._provider, "get_levels"):
+                level = int(self._provider.get_levels().peak * 100)
+                self.level_indicator.setValue(min(level, 100))
+                return
+
+            chunk = self._provider.read_available()
             if not chunk:
                 return
 
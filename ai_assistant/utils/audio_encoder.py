@@ -0,0 +1,59 @@
+import io
+from typing import Optional, Tuple
+import numpy as np
+import soundfile as sf
+
+CODECS = ("flac", "opus", "wav")
+MIMETYPES = {"flac": "audio/flac", "opus": "audio/ogg", "wav": "audio/wav"}
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+DEFAULT_MIN_BYTES = 64 * 1024
+
+
+class UploadEncoder:
+    """Compresses PCM before it is uploaded for transcription.
+
+    FLAC is lossless and roughly halves 16-bit speech; Opus is lossy but an
+    order of magnitude smaller. Payloads under `min_bytes` go up as WAV, where
+    encoding costs more time than the saved bytes. Opus only supports its
+    native sample rates, so other rates fall back to FLAC.
+    """
+
+    def __init__(self, codec: str = "flac", min_bytes: int = DEFAULT_MIN_BYTES):
+        if codec not in CODECS:
+            raise ValueError(f"Unsupported upload codec: {codec}")
+        self.codec = codec
+        self.min_bytes = min_bytes
+
+    @classmethod
+    def from_config(cls, config: Optional[dict] = None) -> "UploadEncoder":
+        """Build an encoder from a provider's `upload` config section"""
+        config = config or {}
+        return cls(
+            codec=config.get("codec", "flac"),
+            min_bytes=config.get("min_bytes", DEFAULT_MIN_BYTES),
+        )
+
+    def choose(self, nbytes: int, sample_rate: int) -> str:
+        """Pick the codec for a payload of `nbytes` of 16-bit PCM"""
+        if nbytes < self.min_bytes:
+            return "wav"
+        if self.codec == "opus" and sample_rate not in OPUS_RATES:
+            return "flac"
+        return self.codec
+
+    def encode(self, audio: np.ndarray, sample_rate: int) -> Tuple[bytes, str]:
+        """Encode int16 or float samples, returning (payload, mimetype)"""
+        if audio.dtype.kind == "f":
+            audio = (np.clip(audio, -1.0, 1.0) * 32767.0).astype(np.int16)
+        codec = self.choose(audio.nbytes, sample_rate)
+        buffer = io.BytesIO()
+        if codec == "opus":
+            sf.write(buffer, audio, sample_rate, format="OGG", subtype="OPUS")
+        else:
+            sf.write(buffer, audio, sample_rate, format=codec.upper(), subtype="PCM_16")
+        return buffer.getvalue(), MIMETYPES[codec]
+
+    def encode_file(self, data: bytes) -> Tuple[bytes, str]:
+        """Re-encode a complete audio file, e.g. a WAV recording"""
+        audio, sample_rate = sf.read(io.BytesIO(data), dtype="int16")
+        return self.encode(audio, sample_rate)
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+import pyaudio
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "ai_assistant", "audio_devices.json"
+)
+PROBE_RATES = [8000, 16000, 22050, 44100, 48000]
+PROBE_FORMATS = {"int16": pyaudio.paInt16, "float32": pyaudio.paFloat32}
+CACHE_VERSION = 1
+
+
+class DeviceCapabilityCache:
+    """On-disk cache of which rates/formats each PortAudio device accepts.
+
+    Entries are keyed by host API and device name. The whole cache is tagged
+    with a fingerprint of the device list (names, channel counts and default
+    rates, which PortAudio reports without opening anything), so a plugged or
+    unplugged device invalidates it. Probing with is_format_supported() only
+    happens on a miss, on the caller's thread. PortAudio state is process-wide
+    and not thread-safe, so there is no background probing to race the
+    caller's own stream calls.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.logger = logging.getLogger(__name__)
+        self._path = path
+        self._lock = threading.Lock()
+        self._data: Optional[dict] = None
+
+    @staticmethod
+    def device_key(host_api: str, name: str) -> str:
+        return f"{host_api}:{name}"
+
+    @staticmethod
+    def _list_devices(audio: pyaudio.PyAudio) -> List[dict]:
+        devices = []
+        for i in range(audio.get_device_count()):
+            info = audio.get_device_info_by_index(i)
+            host_api = audio.get_host_api_info_by_index(info["hostApi"])["name"]
+            devices.append(
+                {
+                    "key": DeviceCapabilityCache.device_key(host_api, info["name"]),
+                    "index": i,
+                    "name": info["name"],
+                    "host_api": host_api,
+                    "max_input_channels": int(info.get("maxInputChannels", 0)),
+                    "max_output_channels": int(info.get("maxOutputChannels", 0)),
+                    "default_sample_rate": int(info["defaultSampleRate"]),
+                }
+            )
+        return devices
+
+    @staticmethod
+    def fingerprint(devices: List[dict]) -> str:
+        digest = hashlib.sha1()
+        for device in devices:
+            digest.update(
+                json.dumps(
+                    [
+                        device["index"],
+                        device["host_api"],
+                        device["name"],
+                        device["max_input_channels"],
+                        device["max_output_channels"],
+                        device["default_sample_rate"],
+                    ]
+                ).encode()
+            )
+        return digest.hexdigest()
+
+    def get_devices(self, audio: pyaudio.PyAudio) -> List[dict]:
+        """Return device capabilities, probing hardware only on a cache miss"""
+        devices = self._list_devices(audio)
+        fingerprint = self.fingerprint(devices)
+
+        with self._lock:
+            if self._data is None:
+                self._data = self._read()
+            data = self._data
+
+        if data and data.get("fingerprint") == fingerprint:
+            self.logger.debug(f"Device capability cache hit ({len(devices)} devices)")
+            return data["devices"]
+
+        self.logger.info("Device list changed or no cache; probing devices")
+        return self._probe_and_store(audio, devices, fingerprint)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._data = None
+            try:
+                os.remove(self._path)
+            except FileNotFoundError:
+                pass
+
+    def _probe_and_store(
+        self, audio: pyaudio.PyAudio, devices: List[dict], fingerprint: str
+    ) -> List[dict]:
+        for device in devices:
+            device["input_rates"] = self._probe(audio, device, "input")
+            device["output_rates"] = self._probe(audio, device, "output")
+
+        data = {
+            "version": CACHE_VERSION,
+            "fingerprint": fingerprint,
+            "devices": devices,
+        }
+        with self._lock:
+            self._data = data
+            self._write(data)
+        return devices
+
+    @staticmethod
+    def _probe(audio: pyaudio.PyAudio, device: dict, direction: str) -> Dict:
+        channels_key = f"max_{direction}_channels"
+        if device[channels_key] <= 0:
+            return {}
+
+        supported = {}
+        for format_name, pa_format in PROBE_FORMATS.items():
+            rates = []
+            for rate in PROBE_RATES:
+                kwargs = {
+                    f"{direction}_device": device["index"],
+                    f"{direction}_channels": 1,
+                    f"{direction}_format": pa_format,
+                }
+                try:
+                    if audio.is_format_supported(rate, **kwargs):
+                        rates.append(rate)
+                except ValueError:
+                    continue
+            supported[format_name] = rates
+        return supported
+
+    def _read(self) -> Optional[dict]:
+        try:
+            with open(self._path, "r") as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_VERSION:
+                return None
+            return data
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable device cache {self._path}: {e}")
+            return None
+
+    def _write(self, data: dict) -> None:
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            tmp_path = f"{self._path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self._path)
+        except Exception as e:
+            self.logger.warning(f"Could not write device cache {self._path}: {e}")
+
+
+def supports(device: dict, direction: str, rate: int, sample_format: str) -> bool:
+    """Check a cached device entry for rate/format support"""
+    return rate in device.get(f"{direction}_rates", {}).get(sample_format, [])
@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+import math
+import numpy as np
+
+
+@dataclass
+class LevelSnapshot:
+    peak: float  # Decaying peak, 0.0-1.0
+    rms: float  # Smoothed RMS, 0.0-1.0
+    envelope: np.ndarray  # Decimated peak envelope, oldest first
+
+
+class LevelMeter:
+    """Peak/RMS meter and decimated waveform envelope, updated from the capture path.
+
+    The capture callback calls update() once per block; the UI calls snapshot()
+    at display rate. All state is a few floats and a small fixed array, so the
+    UI never has to look at raw samples.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        full_scale: float = 32768.0,
+        envelope_rate: int = 100,
+        envelope_length: int = 256,
+        peak_release: float = 0.3,
+        rms_window: float = 0.1,
+    ):
+        self._full_scale = full_scale
+        self._envelope_rate = envelope_rate
+        self._envelope_length = envelope_length
+        self._peak_release = peak_release
+        self._rms_window = rms_window
+        self.reset(sample_rate)
+
+    def reset(self, sample_rate: int) -> None:
+        self._sample_rate = sample_rate
+        self._decimation = max(1, sample_rate // self._envelope_rate)
+        self._envelope = np.zeros(self._envelope_length, dtype=np.float32)
+        self._envelope_pos = 0
+        self._carry_peak = 0.0
+        self._carry_count = 0
+        self._peak = 0.0
+        self._mean_square = 0.0
+
+    def update(self, block: np.ndarray) -> None:
+        """Fold one captured block into the running levels"""
+        count = len(block)
+        if count == 0:
+            return
+        magnitude = np.abs(block.astype(np.float32)) / self._full_scale
+        duration = count / self._sample_rate
+
+        # Peak hold with exponential release
+        decay = math.exp(-duration / self._peak_release)
+        self._peak = max(float(magnitude.max()), self._peak * decay)
+
+        # Exponentially smoothed mean square
+        alpha = 1.0 - math.exp(-duration / self._rms_window)
+        block_ms = float(np.dot(magnitude, magnitude)) / count
+        self._mean_square += alpha * (block_ms - self._mean_square)
+
+        self._update_envelope(magnitude)
+
+    def _update_envelope(self, magnitude: np.ndarray) -> None:
+        # Finish the envelope point left open by the previous block
+        offset = 0
+        if self._carry_count:
+            offset = min(self._decimation - self._carry_count, len(magnitude))
+            if offset:
+                self._carry_peak = max(
+                    self._carry_peak, float(magnitude[:offset].max())
+                )
+            self._carry_count += offset
+            if self._carry_count < self._decimation:
+                return
+            self._push_envelope(np.array([self._carry_peak], dtype=np.float32))
+            self._carry_count = 0
+            self._carry_peak = 0.0
+
+        rest = magnitude[offset:]
+        groups = len(rest) // self._decimation
+        if groups:
+            used = groups * self._decimation
+            self._push_envelope(
+                rest[:used].reshape(groups, self._decimation).max(axis=1)
+            )
+            rest = rest[used:]
+        if len(rest):
+            self._carry_peak = float(rest.max())
+            self._carry_count = len(rest)
+
+    def _push_envelope(self, points: np.ndarray) -> None:
+        points = points[-self._envelope_length :]
+        start = self._envelope_pos % self._envelope_length
+        first = min(len(points), self._envelope_length - start)
+        self._envelope[start : start + first] = points[:first]
+        if len(points) > first:
+            self._envelope[: len(points) - first] = points[first:]
+        self._envelope_pos += len(points)
+
+    @property
+    def peak(self) -> float:
+        return self._peak
+
+    @property
+    def rms(self) -> float:
+        return math.sqrt(self._mean_square)
+
+    def snapshot(self) -> LevelSnapshot:
+        """Return current levels and the envelope in chronological order"""
+        start = self._envelope_pos % self._envelope_length
+        envelope = np.roll(self._envelope, -start)
+        return LevelSnapshot(peak=self._peak, rms=self.rms, envelope=envelope)
@@ -0,0 +1,138 @@
+import struct
+import numpy as np
+
+WAV_HEADER_BYTES = 44
+
+
+class PCMWindow:
+    """Reusable window of mono 16-bit PCM that packs into a WAV in place.
+
+    Samples are converted straight into the data region of a preallocated
+    WAV buffer, and the header is patched when the window is read out, so a
+    steady stream of windows allocates nothing. The buffers only grow when a
+    window or block is larger than any seen before.
+    """
+
+    def __init__(self, sample_rate: int, capacity: int, max_block: int = 4096):
+        self.sample_rate = sample_rate
+        self._length = 0
+        self._allocate(capacity)
+        self._scratch = np.empty(max_block, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def samples(self) -> np.ndarray:
+        """int16 view of the samples in the window"""
+        return self._samples[: self._length]
+
+    def append(self, block: np.ndarray) -> None:
+        """Add int16 samples, or float samples in [-1, 1] (clipped)"""
+        count = len(block)
+        end = self._length + count
+        if end > len(self._samples):
+            self._allocate(max(end, 2 * len(self._samples)))
+        target = self._samples[self._length : end]
+        if block.dtype == np.int16:
+            target[:] = block
+        else:
+            if count > len(self._scratch):
+                self._scratch = np.empty(count, dtype=np.float32)
+            scratch = self._scratch[:count]
+            np.multiply(block, 32767.0, out=scratch)
+            np.clip(scratch, -32768.0, 32767.0, out=scratch)
+            np.copyto(target, scratch, casting="unsafe")
+        self._length = end
+
+    def wav(self) -> memoryview:
+        """The window as a WAV file; valid until the window is next changed"""
+        data_bytes = 2 * self._length
+        struct.pack_into(
+            "<4sI4s4sIHHIIHH4sI",
+            self._wav,
+            0,
+            b"RIFF",
+            36 + data_bytes,
+            b"WAVE",
+            b"fmt ",
+            16,
+            1,  # PCM
+            1,  # Mono
+            self.sample_rate,
+            2 * self.sample_rate,
+            2,
+            16,
+            b"data",
+            data_bytes,
+        )
+        return memoryview(self._wav)[: WAV_HEADER_BYTES + data_bytes]
+
+    def clear(self) -> None:
+        self._length = 0
+
+    def _allocate(self, capacity: int) -> None:
+        wav = bytearray(WAV_HEADER_BYTES + 2 * capacity)
+        samples = np.frombuffer(wav, dtype=np.int16, offset=WAV_HEADER_BYTES)
+        if self._length:
+            samples[: self._length] = self._samples[: self._length]
+        self._wav = wav
+        self._samples = samples
+
+
+def benchmark(windows: int = 2000, chunk: int = 1024, window_seconds: float = 0.5):
+    """Measure steady-state allocations of the window path.
+
+    Feeds simulated 16 kHz capture chunks (int16 and float32) through a
+    PCMWindow and reports the peak extra traced memory and the number of
+    garbage collections during the timed loop. Run with:
+        python -m utils.pcm_window
+    """
+    import gc
+    import time
+    import tracemalloc
+
+    rate = 16000
+    window_samples = int(rate * window_seconds)
+    rng = np.random.default_rng(0)
+    sources = {
+        "int16": (rng.standard_normal(chunk) * 3000).astype(np.int16).tobytes(),
+        "float32": (rng.standard_normal(chunk) * 0.1).astype(np.float32).tobytes(),
+    }
+    collections = []
+    gc.callbacks.append(lambda phase, info: phase == "start" and collections.append(1))
+    try:
+        for name, chunk_bytes in sources.items():
+            dtype = np.dtype(name)
+            window = PCMWindow(rate, window_samples + chunk, max_block=chunk)
+
+            def run(count):
+                emitted = 0
+                while emitted < count:
+                    window.append(np.frombuffer(chunk_bytes, dtype=dtype))
+                    if len(window) >= window_samples:
+                        window.wav()
+                        window.clear()
+                        emitted += 1
+
+            run(10)  # Warm up: buffers reach their steady-state size
+            collections.clear()
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            run(windows)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+            tracemalloc.stop()
+            print(
+                f"{name:>7}: {windows} windows in {elapsed * 1000:.1f} ms "
+                f"({elapsed / windows * 1e6:.1f} us/window), "
+                f"peak extra memory {peak} bytes, "
+                f"{len(collections)} GC runs"
+            )
+    finally:
+        gc.callbacks.pop()
+
+
+if __name__ == "__main__":
+    benchmark()
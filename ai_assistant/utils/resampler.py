@@ -0,0 +1,116 @@
+from functools import lru_cache
+from math import gcd
+import numpy as np
+from scipy import signal
+
+
+@lru_cache(maxsize=16)
+def polyphase_filter(up: int, down: int) -> np.ndarray:
+    """Design the anti-aliasing FIR for an up/down ratio, split into phases.
+
+    Returns an (up, taps_per_phase) float32 array where row p holds the taps
+    used for output samples that land on phase p of the upsampled grid. The
+    filter length follows scipy.signal.resample_poly (about 20 taps per unit
+    of the larger rate factor).
+    """
+    max_rate = max(up, down)
+    taps_per_phase = -(-20 * max_rate // up)
+    numtaps = up * taps_per_phase
+    # Odd length, so the group delay is a whole number of upsampled samples
+    # that resample() can cancel exactly; a trailing zero fills the phases
+    length = numtaps - 1 + numtaps % 2
+    taps = np.zeros(numtaps)
+    taps[:length] = signal.firwin(length, 1.0 / max_rate, window=("kaiser", 5.0))
+    taps *= up  # Compensate for the zeros inserted by upsampling
+    return taps.reshape(taps_per_phase, up).T.astype(np.float32).copy()
+
+
+# Precompute the ratios every capture device in practice hits
+for _source_rate in (44100, 48000):
+    _g = gcd(_source_rate, 16000)
+    polyphase_filter(16000 // _g, _source_rate // _g)
+
+
+class StreamingResampler:
+    """Stateful polyphase resampler for block-by-block audio.
+
+    Filter history and the output phase carry over between calls, so
+    consecutive blocks resample exactly like one continuous signal, without
+    the edge artifacts of per-window FFT resampling.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int = 16000):
+        self.source_rate = int(source_rate)
+        self.target_rate = int(target_rate)
+        g = gcd(self.source_rate, self.target_rate)
+        self.up = self.target_rate // g
+        self.down = self.source_rate // g
+        self._phases = (
+            polyphase_filter(self.up, self.down) if not self.passthrough else None
+        )
+        self.reset()
+
+    @property
+    def passthrough(self) -> bool:
+        return self.up == self.down
+
+    def reset(self) -> None:
+        taps = self._phases.shape[1] if self._phases is not None else 1
+        self._history = np.zeros(taps - 1, dtype=np.float32)
+        self._consumed = 0  # Input samples seen so far
+        self._next_out = 0  # Index of the next output sample
+        self._delay = 0  # Upsampled-grid offset of every output sample
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Resample one block, returning every output sample it completes"""
+        block = np.asarray(block, dtype=np.float32)
+        if self.passthrough:
+            return block
+
+        taps = self._phases.shape[1]
+        x = np.concatenate((self._history, block))
+        base = self._consumed - (taps - 1)  # Input index of x[0]
+        total_in = self._consumed + len(block)
+
+        # Output n reads input index (n * down + delay) // up, which must be
+        # < total_in
+        n_end = max(self._next_out, -(-(total_in * self.up - self._delay) // self.down))
+        n = np.arange(self._next_out, n_end, dtype=np.int64)
+        if len(n):
+            position = n * self.down + self._delay
+            phase = position % self.up
+            index = position // self.up - base
+            window = x[index[:, None] - np.arange(taps)]
+            out = np.einsum("ij,ij->i", window, self._phases[phase])
+        else:
+            out = np.empty(0, dtype=np.float32)
+
+        self._history = x[len(x) - (taps - 1) :]
+        self._consumed = total_in
+        self._next_out = n_end
+        return out.astype(np.float32, copy=False)
+
+    def flush(self) -> np.ndarray:
+        """Push out the samples still held back by the filter delay"""
+        if self.passthrough:
+            return np.empty(0, dtype=np.float32)
+        taps = self._phases.shape[1]
+        return self.process(np.zeros(taps // 2, dtype=np.float32))
+
+    def resample(self, audio: np.ndarray) -> np.ndarray:
+        """Resample a complete buffer in one go (resets stream state).
+
+        Unlike streaming, the whole input is known, so each output sample is
+        read half a filter length ahead to cancel the filter's group delay.
+        The result is aligned with the input and has ceil(len * up / down)
+        samples, like scipy.signal.resample_poly.
+        """
+        audio = np.asarray(audio, dtype=np.float32)
+        if self.passthrough:
+            return audio
+        self.reset()
+        self._delay = (self._phases.size - 1) // 2
+        taps = self._phases.shape[1]
+        out = self.process(np.concatenate((audio, np.zeros(taps, dtype=np.float32))))
+        self.reset()
+        return out[: -(-len(audio) * self.up // self.down)]
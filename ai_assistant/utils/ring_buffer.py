@@ -0,0 +1,170 @@
+import threading
+from enum import Enum
+from typing import List, Optional
+import numpy as np
+
+
+class OverflowPolicy(Enum):
+    """What a lagging subscriber does when the writer laps it"""
+
+    DROP_OLDEST = "drop_oldest"  # Keep the newest `capacity` frames of backlog
+    SKIP_TO_LATEST = "skip_to_latest"  # Discard the backlog and jump to live audio
+
+
+class RingSubscription:
+    """Independent read cursor over a BroadcastRingBuffer"""
+
+    def __init__(
+        self, ring: "BroadcastRingBuffer", name: str, policy: OverflowPolicy
+    ):
+        self.name = name
+        self.policy = policy
+        self._ring = ring
+        self._read_pos = ring.write_position
+        self._dropped = 0
+        self._data_ready = threading.Event()
+
+    @property
+    def dropped(self) -> int:
+        """Number of frames this subscriber lost by falling behind"""
+        return self._dropped
+
+    def available(self) -> int:
+        self._catch_up()
+        return self._ring.write_position - self._read_pos
+
+    def read(self, frames: int, timeout: Optional[float] = None) -> np.ndarray:
+        """Copy out exactly `frames` frames, waiting up to `timeout` seconds"""
+        while self.available() < frames:
+            self._data_ready.clear()
+            if self.available() >= frames:
+                break
+            if not self._data_ready.wait(timeout):
+                break
+        return self._copy(min(frames, self.available()))
+
+    def read_available(self) -> np.ndarray:
+        """Copy out everything buffered for this subscriber without blocking"""
+        return self._copy(self.available())
+
+    def read_view(self, max_frames: Optional[int] = None) -> np.ndarray:
+        """Return a zero-copy view of the next contiguous run of frames.
+
+        The view aliases the ring's storage and is only valid until the writer
+        comes around again, so consume it promptly. Returns fewer frames than
+        are available when the data wraps around the end of the buffer.
+        """
+        count = self.available()
+        if max_frames is not None:
+            count = min(count, max_frames)
+        start = self._read_pos % self._ring.capacity
+        count = min(count, self._ring.capacity - start)
+        view = self._ring._buffer[start : start + count]
+        self._read_pos += count
+        return view
+
+    def skip(self, frames: Optional[int] = None) -> None:
+        """Discard `frames` frames, or everything buffered if None"""
+        available = self.available()
+        self._read_pos += available if frames is None else min(frames, available)
+
+    def close(self) -> None:
+        self._ring.unsubscribe(self)
+
+    def _notify(self) -> None:
+        self._data_ready.set()
+
+    def _catch_up(self) -> None:
+        """Apply the overflow policy if the writer has lapped this cursor"""
+        write_pos = self._ring.write_position
+        if write_pos - self._read_pos <= self._ring.capacity:
+            return
+        if self.policy is OverflowPolicy.SKIP_TO_LATEST:
+            new_pos = write_pos
+        else:
+            new_pos = write_pos - self._ring.capacity
+        self._dropped += new_pos - self._read_pos
+        self._read_pos = new_pos
+
+    def _copy(self, count: int) -> np.ndarray:
+        ring = self._ring
+        start_pos = self._read_pos
+        out = np.empty(count, dtype=ring.dtype)
+        if count > 0:
+            start = start_pos % ring.capacity
+            first = min(count, ring.capacity - start)
+            out[:first] = ring._buffer[start : start + first]
+            if count > first:
+                out[first:] = ring._buffer[: count - first]
+            self._read_pos += count
+
+            # Frames the writer reached while we were copying are garbage
+            overwritten = ring._write_limit - ring.capacity - start_pos
+            if overwritten > 0:
+                overwritten = min(overwritten, count)
+                self._dropped += overwritten
+                out = out[overwritten:]
+        return out
+
+
+class BroadcastRingBuffer:
+    """Single-writer ring buffer that fans each block out to many readers.
+
+    Every subscriber has its own read cursor over the same storage, so a meter,
+    a recorder and a transcriber can all see every frame. The writer never
+    waits: a subscriber that falls more than `capacity` frames behind loses
+    data according to its OverflowPolicy, without affecting anyone else.
+    """
+
+    def __init__(self, capacity: int, dtype=np.int16):
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive")
+        self._buffer = np.zeros(capacity, dtype=dtype)
+        self._capacity = capacity
+        self._write_pos = 0
+        self._write_limit = 0  # End of the region currently being written
+        self._subscribers: List[RingSubscription] = []
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._buffer.dtype
+
+    @property
+    def write_position(self) -> int:
+        return self._write_pos
+
+    def subscribe(
+        self, name: str, policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST
+    ) -> RingSubscription:
+        """Add a reader that starts at the current write position"""
+        subscription = RingSubscription(self, name, policy)
+        # Copy-on-write so the writer can iterate without a lock
+        self._subscribers = self._subscribers + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription: RingSubscription) -> None:
+        self._subscribers = [s for s in self._subscribers if s is not subscription]
+
+    def write(self, data: np.ndarray) -> None:
+        """Append frames, overwriting the oldest data; never blocks"""
+        count = len(data)
+        if count == 0:
+            return
+        if count > self._capacity:
+            # Only the tail can ever be read back
+            self._write_pos += count - self._capacity
+            data = data[-self._capacity :]
+            count = self._capacity
+        self._write_limit = self._write_pos + count
+        start = self._write_pos % self._capacity
+        first = min(count, self._capacity - start)
+        self._buffer[start : start + first] = data[:first]
+        if count > first:
+            self._buffer[: count - first] = data[first:]
+        self._write_pos += count
+        for subscription in self._subscribers:
+            subscription._notify()
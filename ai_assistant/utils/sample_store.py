@@ -0,0 +1,86 @@
+from typing import Iterator, List
+import numpy as np
+
+
+class SampleStore:
+    """Append-only sample storage made of preallocated NumPy blocks.
+
+    Each new block is twice the size of the previous one, so appends are
+    amortized O(1) and existing samples are never moved or re-joined. Readers
+    get zero-copy views over the filled part of each block.
+    """
+
+    def __init__(self, initial_capacity: int = 65536, dtype=np.int16):
+        if initial_capacity <= 0:
+            raise ValueError("Initial capacity must be positive")
+        self._dtype = np.dtype(dtype)
+        self._initial_capacity = initial_capacity
+        self._blocks: List[np.ndarray] = []
+        self._fill = 0  # Samples used in the last block
+        self._length = 0
+        self._appends = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    @property
+    def appends(self) -> int:
+        """Number of append() calls since the last clear()"""
+        return self._appends
+
+    @property
+    def nbytes(self) -> int:
+        return self._length * self._dtype.itemsize
+
+    @property
+    def allocated_bytes(self) -> int:
+        return sum(block.nbytes for block in self._blocks)
+
+    def append(self, data: np.ndarray) -> None:
+        """Copy samples into the store, growing it by doubling when full"""
+        data = np.asarray(data, dtype=self._dtype).reshape(-1)
+        offset = 0
+        while offset < len(data):
+            if not self._blocks or self._fill == len(self._blocks[-1]):
+                size = (
+                    len(self._blocks[-1]) * 2
+                    if self._blocks
+                    else self._initial_capacity
+                )
+                self._blocks.append(np.empty(size, dtype=self._dtype))
+                self._fill = 0
+            block = self._blocks[-1]
+            count = min(len(data) - offset, len(block) - self._fill)
+            block[self._fill : self._fill + count] = data[offset : offset + count]
+            self._fill += count
+            offset += count
+        self._length += len(data)
+        self._appends += 1
+
+    def arrays(self) -> Iterator[np.ndarray]:
+        """Yield read-only NumPy views over the stored samples, in order"""
+        remaining = self._length
+        for block in self._blocks:
+            if remaining <= 0:
+                break
+            count = min(len(block), remaining)
+            view = block[:count]
+            view.flags.writeable = False
+            yield view
+            remaining -= count
+
+    def views(self) -> Iterator[memoryview]:
+        """Yield byte-level memoryviews over the stored samples, in order"""
+        for array in self.arrays():
+            yield memoryview(array).cast("B")
+
+    def clear(self) -> None:
+        """Drop all samples, keeping the first block for reuse"""
+        del self._blocks[1:]
+        self._fill = 0
+        self._length = 0
+        self._appends = 0
@@ -0,0 +1,103 @@
+import logging
+import subprocess
+import threading
+from typing import Iterable, Iterator, Optional
+from pydub import AudioSegment
+
+PCM_FORMATS = {"pcm", "s16le"}
+
+
+class StreamingDecoder:
+    """Decode compressed audio (MP3 from TTS) to PCM as the bytes arrive.
+
+    Encoded chunks are piped into ffmpeg (the same converter pydub uses) by a
+    feeder thread while decoded 16-bit PCM is read back and yielded, so the
+    first frames come out as soon as the first network chunk is decodable
+    instead of after the whole clip has downloaded. Output is resampled to a
+    fixed rate/channel count so playback can be opened before decoding starts.
+    """
+
+    def __init__(
+        self,
+        input_format: str = "mp3",
+        sample_rate: int = 44100,
+        channels: int = 1,
+        read_size: int = 4096,
+        converter: Optional[str] = None,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.input_format = input_format
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = 2
+        self._read_size = read_size
+        self._converter = converter or AudioSegment.converter
+
+    def decode(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Yield PCM (s16le) bytes decoded from an iterable of encoded chunks"""
+        if self.input_format in PCM_FORMATS:
+            # Already raw PCM at the configured rate, nothing to decode
+            yield from (chunk for chunk in chunks if chunk)
+            return
+
+        process = subprocess.Popen(
+            [
+                self._converter,
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-fflags",
+                "nobuffer",
+                "-f",
+                self.input_format,
+                "-i",
+                "pipe:0",
+                "-f",
+                "s16le",
+                "-acodec",
+                "pcm_s16le",
+                "-ac",
+                str(self.channels),
+                "-ar",
+                str(self.sample_rate),
+                "pipe:1",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        feeder = threading.Thread(
+            target=self._feed, args=(process, chunks), daemon=True
+        )
+        feeder.start()
+
+        try:
+            while True:
+                data = process.stdout.read1(self._read_size)
+                if not data:
+                    break
+                yield data
+        finally:
+            if process.poll() is None:
+                process.kill()  # Consumer stopped early (e.g. playback cancelled)
+            process.wait()
+            feeder.join(timeout=1.0)
+            error = process.stderr.read().decode(errors="replace").strip()
+            if process.returncode not in (0, -9) and error:
+                self.logger.error(f"ffmpeg decode failed: {error}")
+
+    def _feed(self, process: subprocess.Popen, chunks: Iterable[bytes]) -> None:
+        try:
+            for chunk in chunks:
+                if chunk:
+                    process.stdin.write(chunk)
+                    process.stdin.flush()
+        except (BrokenPipeError, ValueError):
+            pass  # Decoder was shut down before the input ended
+        except Exception as e:
+            self.logger.error(f"Error feeding audio decoder: {e}")
+        finally:
+            try:
+                process.stdin.close()
+            except Exception:
+                pass
@@ -0,0 +1,62 @@
+import re
+from typing import List, Optional
+
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+|\n+")
+_CLAUSE_END = re.compile(r"[,;:–—]\s+")
+_ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "st.", "vs.", "etc.", "e.g.", "i.e."}
+
+
+class SentenceSegmenter:
+    """Split streamed LLM text into speakable segments.
+
+    Text is cut after sentence punctuation followed by whitespace. A cut that
+    would leave fewer than `min_chars` is skipped so TTS isn't asked for one
+    word at a time. A run-on sentence longer than `max_chars` is cut at the
+    last clause boundary (or space) instead of waiting for its full stop.
+    """
+
+    def __init__(self, min_chars: int = 20, max_chars: int = 200):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text and return every segment it completes"""
+        self._buffer += text
+        segments = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            segment = self._buffer[:cut].strip()
+            self._buffer = self._buffer[cut:]
+            if segment:
+                segments.append(segment)
+        return segments
+
+    def flush(self) -> Optional[str]:
+        """Return whatever text is left once the stream has ended"""
+        segment = self._buffer.strip()
+        self._buffer = ""
+        return segment or None
+
+    def reset(self) -> None:
+        self._buffer = ""
+
+    def _find_cut(self) -> Optional[int]:
+        for match in _SENTENCE_END.finditer(self._buffer):
+            if match.end() < self.min_chars:
+                continue
+            words = self._buffer[: match.start() + 1].split()
+            if words and words[-1].lower() in _ABBREVIATIONS:
+                continue
+            return match.end()
+
+        if len(self._buffer) <= self.max_chars:
+            return None
+        head = self._buffer[: self.max_chars]
+        clauses = list(_CLAUSE_END.finditer(head))
+        if clauses and clauses[-1].end() >= self.min_chars:
+            return clauses[-1].end()
+        space = head.rfind(" ")
+        return space + 1 if space >= self.min_chars else self.max_chars
@@ -0,0 +1,48 @@
+import dataclasses
+import string
+from typing import List
+from core.interfaces.speech import TranscriptHypothesis
+
+
+def _words(text: str) -> List[str]:
+    return [w.strip(string.punctuation).lower() for w in text.split()]
+
+
+class HypothesisTracker:
+    """Assign segment IDs and stability to a provider's raw hypotheses.
+
+    Partials and the final that settles them share a segment ID; the next
+    segment starts after each final. Stability is the fraction of a partial's
+    words that repeat the previous partial's leading words, so consumers can
+    act on a prefix that has stopped changing. Finals are always 1.0.
+    """
+
+    def __init__(self):
+        self._segment_id = 0
+        self._previous: List[str] = []
+
+    def track(self, hypothesis: TranscriptHypothesis) -> TranscriptHypothesis:
+        words = _words(hypothesis.text)
+        if hypothesis.is_final:
+            stability = 1.0
+        else:
+            agreed = 0
+            for previous, current in zip(self._previous, words):
+                if previous != current:
+                    break
+                agreed += 1
+            stability = agreed / len(words) if words else 0.0
+        tracked = dataclasses.replace(
+            hypothesis, stability=stability, segment_id=self._segment_id
+        )
+
+        if hypothesis.is_final:
+            self._segment_id += 1
+            # A final may settle only the head of the last partial; the rest
+            # is still the reference for the next segment's first partial
+            count = len(words)
+            matches = self._previous[:count] == words
+            self._previous = self._previous[count:] if matches else []
+        else:
+            self._previous = words
+        return tracked
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "ai_assistant", "tts"
+)
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+class TTSCache:
+    """Content-addressed on-disk cache of synthesized speech.
+
+    Each clip is stored under a hash of (voice_id, model_id, voice_settings,
+    normalized text), so a repeated phrase with the same voice plays from disk
+    without a synthesis round trip. Entries are evicted least recently used
+    first once the cache grows past `max_bytes`; file mtimes record use, so
+    the order survives restarts.
+    """
+
+    _instance = None
+
+    def __init__(
+        self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.logger = logging.getLogger(__name__)
+        self._dir = directory
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # Oldest first
+        self._size = 0
+        self._load_index()
+
+    @classmethod
+    def get_instance(cls) -> "TTSCache":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Canonical form of an utterance: NFKC, collapsed whitespace"""
+        return " ".join(unicodedata.normalize("NFKC", text).split())
+
+    @classmethod
+    def key(
+        cls,
+        text: str,
+        voice_id: Optional[str],
+        model_id: Optional[str],
+        voice_settings: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        payload = json.dumps(
+            {
+                "voice_id": voice_id,
+                "model_id": model_id,
+                "voice_settings": voice_settings or {},
+                "text": cls.normalize_text(text),
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached clip and mark it as recently used"""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)
+            except OSError:
+                self._size -= self._entries.pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store a clip, evicting least recently used clips past the size cap"""
+        if not data or len(data) > self._max_bytes:
+            return
+        with self._lock:
+            try:
+                os.makedirs(self._dir, exist_ok=True)
+                tmp_path = f"{self._path(key)}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, self._path(key))
+            except OSError as e:
+                self.logger.warning(f"Could not write TTS cache entry: {e}")
+                return
+            self._size += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._evict()
+
+    def prewarm(
+        self,
+        phrases: Iterable[str],
+        key_for: Callable[[str], str],
+        synthesize: Callable[[str], bytes],
+    ) -> threading.Thread:
+        """Synthesize uncached phrases on a background thread"""
+
+        def warm():
+            for phrase in phrases:
+                key = key_for(phrase)
+                if key in self:
+                    continue
+                try:
+                    self.put(key, synthesize(phrase))
+                except Exception as e:
+                    self.logger.warning(f"Could not pre-warm '{phrase}': {e}")
+            self.logger.info(f"TTS cache warm: {len(self._entries)} clips")
+
+        thread = threading.Thread(target=warm, daemon=True)
+        thread.start()
+        return thread
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._dir, key)
+
+    def _evict(self) -> None:
+        while self._size > self._max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _load_index(self) -> None:
+        try:
+            names = [n for n in os.listdir(self._dir) if not n.endswith(".tmp")]
+        except FileNotFoundError:
+            return
+        entries = []
+        for name in names:
+            try:
+                stat = os.stat(self._path(name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._entries[name] = size
+            self._size += size
+        self._evict()
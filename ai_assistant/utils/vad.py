@@ -0,0 +1,203 @@
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import List, Optional, Tuple, Union
+import numpy as np
+
+
+class VADEventType(Enum):
+    SPEECH_START = auto()
+    SPEECH_END = auto()
+
+
+@dataclass
+class VADEvent:
+    type: VADEventType
+    sample: int  # Absolute sample index where the transition was detected
+
+
+def frame_energy(frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return per-frame RMS and peak for a (n_frames, frame_length) array"""
+    frames = frames.astype(np.float32, copy=False)
+    rms = np.sqrt(np.mean(np.square(frames), axis=1))
+    peak = np.max(np.abs(frames), axis=1)
+    return rms, peak
+
+
+class EnergyVAD:
+    """Energy-based voice activity detector with hysteresis and hangover.
+
+    Audio is cut into fixed frames and scored with vectorized RMS on the real
+    sample values (int16 input is scaled to [-1, 1]). Speech starts once
+    `min_speech_ms` of frames exceed `start_threshold` and ends after
+    `hangover_ms` of frames below `stop_threshold`.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        dtype=np.float32,
+        frame_ms: float = 30.0,
+        start_threshold: float = 0.02,
+        stop_threshold: float = 0.01,
+        min_speech_ms: float = 60.0,
+        hangover_ms: float = 1000.0,
+    ):
+        if stop_threshold > start_threshold:
+            raise ValueError("stop_threshold must not exceed start_threshold")
+        self.sample_rate = sample_rate
+        self.dtype = np.dtype(dtype)
+        self.frame_length = max(1, int(sample_rate * frame_ms / 1000))
+        self.start_threshold = start_threshold
+        self.stop_threshold = stop_threshold
+        self._start_frames = max(1, round(min_speech_ms / frame_ms))
+        self._hangover_frames = max(1, round(hangover_ms / frame_ms))
+        self._scale = (
+            1.0 / -np.iinfo(self.dtype).min if self.dtype.kind == "i" else 1.0
+        )
+        self.reset()
+
+    @classmethod
+    def from_config(
+        cls, sample_rate: int, config: Optional[dict] = None, dtype=np.float32
+    ) -> "EnergyVAD":
+        """Build a detector from a provider's `vad` config section"""
+        config = config or {}
+        return cls(
+            sample_rate,
+            dtype=dtype,
+            frame_ms=config.get("frame_ms", 30.0),
+            start_threshold=config.get("start_threshold", 0.02),
+            stop_threshold=config.get("stop_threshold", 0.01),
+            min_speech_ms=config.get("min_speech_ms", 60.0),
+            hangover_ms=config.get("hangover_ms", 1000.0),
+        )
+
+    def reset(self) -> None:
+        self._pending = np.empty(0, dtype=np.float32)
+        self._position = 0  # Samples consumed into complete frames
+        self._in_speech = False
+        self._loud_run = 0
+        self._quiet_run = 0
+        self.last_rms = 0.0
+        self.last_peak = 0.0
+
+    @property
+    def is_speech(self) -> bool:
+        return self._in_speech
+
+    def process(self, audio: Union[bytes, np.ndarray]) -> List[VADEvent]:
+        """Feed a block of audio and return any speech start/end transitions"""
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            audio = np.frombuffer(audio, dtype=self.dtype)
+        samples = audio.astype(np.float32) * self._scale
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+
+        n_frames = len(samples) // self.frame_length
+        used = n_frames * self.frame_length
+        self._pending = samples[used:]
+        if n_frames == 0:
+            return []
+
+        rms, peak = frame_energy(samples[:used].reshape(n_frames, self.frame_length))
+        self.last_rms = float(rms[-1])
+        self.last_peak = float(peak[-1])
+
+        events = []
+        loud = rms >= self.start_threshold
+        quiet = rms < self.stop_threshold
+        for i in range(n_frames):
+            if not self._in_speech:
+                self._loud_run = self._loud_run + 1 if loud[i] else 0
+                if self._loud_run >= self._start_frames:
+                    self._in_speech = True
+                    self._quiet_run = 0
+                    start = (self._loud_run - 1) * self.frame_length
+                    events.append(
+                        VADEvent(
+                            VADEventType.SPEECH_START,
+                            self._position + i * self.frame_length - start,
+                        )
+                    )
+            else:
+                self._quiet_run = self._quiet_run + 1 if quiet[i] else 0
+                if self._quiet_run >= self._hangover_frames:
+                    self._in_speech = False
+                    self._loud_run = 0
+                    events.append(
+                        VADEvent(
+                            VADEventType.SPEECH_END,
+                            self._position + (i + 1) * self.frame_length,
+                        )
+                    )
+        self._position += used
+        return events
+
+    def flush(self) -> Optional[VADEvent]:
+        """Close an open speech segment at end of stream"""
+        if not self._in_speech:
+            return None
+        self._in_speech = False
+        self._loud_run = 0
+        return VADEvent(
+            VADEventType.SPEECH_END, self._position + len(self._pending)
+        )
+
+
+def speech_segments(
+    audio: np.ndarray,
+    sample_rate: int,
+    config: Optional[dict] = None,
+    pad_ms: float = 200.0,
+    max_segment_s: float = 30.0,
+) -> List[Tuple[int, int]]:
+    """Split a complete recording into (start, end) sample spans of speech.
+
+    Spans are padded by `pad_ms` on both sides and merged where the padding
+    overlaps. Spans longer than `max_segment_s` are cut at the quietest frame
+    in the last fifth before the limit, so words are rarely split.
+    Unlike live capture, a short hangover is used so pauses split segments.
+    """
+    vad = EnergyVAD.from_config(
+        sample_rate, {"hangover_ms": 300.0, **(config or {})}, dtype=audio.dtype
+    )
+    events = vad.process(audio)
+    end = vad.flush()
+    if end is not None:
+        events.append(end)
+
+    pad = int(sample_rate * pad_ms / 1000)
+    spans: List[Tuple[int, int]] = []
+    start = 0
+    for event in events:
+        if event.type == VADEventType.SPEECH_START:
+            start = max(0, event.sample - pad)
+            continue
+        stop = min(len(audio), event.sample + pad)
+        if spans and start <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], stop)
+        else:
+            spans.append((start, stop))
+
+    max_length = int(max_segment_s * sample_rate)
+    search = max(vad.frame_length, max_length // 5)
+    segments = []
+    for start, stop in spans:
+        while stop - start > max_length:
+            cut = _quietest_cut(
+                audio, start + max_length - search, start + max_length, vad
+            )
+            segments.append((start, cut))
+            start = cut
+        segments.append((start, stop))
+    return segments
+
+
+def _quietest_cut(audio: np.ndarray, lo: int, hi: int, vad: EnergyVAD) -> int:
+    """Sample index between lo and hi at the end of the lowest-energy frame"""
+    n_frames = (hi - lo) // vad.frame_length
+    if n_frames == 0:
+        return hi
+    frames = audio[hi - n_frames * vad.frame_length : hi]
+    rms, _ = frame_energy(frames.reshape(n_frames, vad.frame_length))
+    return hi - (n_frames - 1 - int(np.argmin(rms))) * vad.frame_length
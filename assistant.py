@@ -5,7 +5,6 @@ import requests
 import io
 import os
 from pydub import AudioSegment
-from pydub.playback import play as pydub_play
 import pydub
 from deepgram import (
     DeepgramClient,
@@ -27,8 +26,16 @@ from utils import find_input_device_index, find_output_device_index
 import asyncio
 from speech_recognition_handler import transcribe_audio
 from PyQt6.QtCore import QObject, pyqtSignal
+from ai_assistant.utils.stream_decoder import StreamingDecoder
+from ai_assistant.utils.tts_cache import TTSCache
 import elevenlabs  # Change this import
 
+VOICE_MODEL = "eleven_monolingual_v1"
+# Synthesized in the background at startup so they play without a round trip
+DEFAULT_PREWARM_PHRASES = [
+    "Sorry, I encountered an error processing your message.",
+]
+
 
 # Make Assistant inherit from QObject to enable signals
 class Assistant(QObject):
@@ -56,6 +63,7 @@ class Assistant(QObject):
         self.recognizer = sr.Recognizer()
         self.pyaudio = pyaudio.PyAudio()
         self.stream = None
+        self.tts_cache = TTSCache.get_instance()
 
     def configure(
         self,
@@ -70,6 +78,12 @@ class Assistant(QObject):
         if os.getenv("ELEVENLABS_API_KEY"):
             elevenlabs.set_api_key(os.getenv("ELEVENLABS_API_KEY"))
             self.elevenlabs_configured = True
+            phrases = DEFAULT_PREWARM_PHRASES + (
+                (app_settings or {}).get("elevenlabs", {}).get("prewarm_phrases", [])
+            )
+            self.tts_cache.prewarm(
+                phrases, self._voice_cache_key, self._synthesize_voice
+            )
 
         if os.getenv("DEEPGRAM_API_KEY"):
             self.deepgram_client = DeepgramClient(os.getenv("DEEPGRAM_API_KEY"))
@@ -127,13 +141,26 @@ class Assistant(QObject):
             self.logger.error(f"Error getting AI response: {e}")
             raise
 
+    def _voice_cache_key(self, text):
+        return TTSCache.key(
+            text,
+            self.voice_id,
+            VOICE_MODEL,
+            {"stability": self.stability, "similarity_boost": self.similarity_boost},
+        )
+
+    def _synthesize_voice(self, text):
+        return elevenlabs.generate(text=text, voice=self.voice_id, model=VOICE_MODEL)
+
     async def _generate_voice(self, text):
-        """Generate voice response using ElevenLabs"""
+        """Generate voice response using ElevenLabs, reusing cached clips"""
         try:
             if hasattr(self, "elevenlabs_configured"):
-                audio = elevenlabs.generate(
-                    text=text, voice=self.voice_id, model="eleven_monolingual_v1"
-                )
+                key = self._voice_cache_key(text)
+                audio = self.tts_cache.get(key)
+                if audio is None:
+                    audio = self._synthesize_voice(text)
+                    self.tts_cache.put(key, audio)
                 return audio
         except Exception as e:
             self.logger.error(f"Error generating voice: {e}")
@@ -157,17 +184,57 @@ class Assistant(QObject):
             self.logger.error(f"Error in process(): {e}")
             raise
 
+    def _stream_voice(self, text):
+        """Generate voice with ElevenLabs, yielding MP3 chunks as they arrive"""
+        return elevenlabs.generate(
+            text=text, voice=self.voice_id, model=VOICE_MODEL, stream=True
+        )
+
+    def _cached_voice_stream(self, text):
+        """MP3 chunks for text: from the cache, or streamed and then cached"""
+        key = self._voice_cache_key(text)
+        cached = self.tts_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        for chunk in self._stream_voice(text):
+            chunks.append(chunk)
+            yield chunk
+        # Only reached when the whole clip arrived, so partial clips aren't cached
+        self.tts_cache.put(key, b"".join(chunks))
+
     def speak(self, text):
         """Convert text to speech and play it"""
         try:
             if hasattr(self, "elevenlabs_configured"):
-                audio = asyncio.run(self._generate_voice(text))
-                if audio:
-                    # Convert audio bytes to AudioSegment
-                    audio_segment = AudioSegment.from_file(
-                        io.BytesIO(audio), format="mp3"
-                    )
-                    # Play the audio
-                    pydub_play(audio_segment)
+                # Decode and play while the MP3 is still downloading, so the
+                # first sound doesn't wait for the whole clip
+                decoder = StreamingDecoder(input_format="mp3")
+                self.play_pcm_stream(
+                    decoder.decode(self._cached_voice_stream(text)),
+                    decoder.sample_rate,
+                    decoder.channels,
+                    decoder.sample_width,
+                )
         except Exception as e:
             self.logger.error(f"Error in speak(): {e}")
+
+    def play_pcm_stream(self, pcm_chunks, sample_rate, channels=1, sample_width=2):
+        """Play PCM chunks on the default output device as they are produced"""
+        out_stream = None
+        try:
+            for chunk in pcm_chunks:
+                if out_stream is None:
+                    out_stream = self.pyaudio.open(
+                        format=self.pyaudio.get_format_from_width(sample_width),
+                        channels=channels,
+                        rate=sample_rate,
+                        output=True,
+                    )
+                out_stream.write(chunk)
+        finally:
+            if out_stream is not None:
+                out_stream.stop_stream()
+                out_stream.close()
@@ -9,6 +9,11 @@ from pydub import AudioSegment
 import io
 import time
 from utils import find_input_device_index, find_output_device_index
+from ai_assistant.utils.vad import EnergyVAD, VADEventType
+from ai_assistant.utils.device_cache import DeviceCapabilityCache, supports
+from ai_assistant.utils.stream_decoder import StreamingDecoder
+from ai_assistant.utils.audio_encoder import UploadEncoder
+import numpy as np
 import os
 from threading import Lock
 
@@ -84,17 +89,28 @@ class AudioManager(QObject):
             sample_rates = [16000, 44100, 48000, 8000]
             self.rate = None
 
+            # Device capabilities come from the on-disk cache; hardware is only
+            # probed when the device list changed
+            self.device_cache = DeviceCapabilityCache()
+            devices = self.device_cache.get_devices(self.audio)
+
             # Find and validate devices
-            self.input_device_index = find_input_device_index(self.audio)
+            self.input_device_index = find_input_device_index(self.audio, devices)
             if self.input_device_index is None:
                 self.logger.error("No valid input device found")
                 raise RuntimeError("No valid input device available")
 
-            # Test sample rates on the selected device
-            device_info = self.audio.get_device_info_by_index(self.input_device_index)
-            self.logger.debug(f"Testing device: {device_info['name']}")
+            device = devices[self.input_device_index]
+            self.logger.debug(f"Testing device: {device['name']}")
 
             for rate in sample_rates:
+                if supports(device, "input", rate, "float32"):
+                    self.rate = rate
+                    self.logger.info(f"Using sample rate: {rate}Hz (cached)")
+                    break
+
+            # Only open test streams if the cache had nothing usable
+            for rate in sample_rates if self.rate is None else []:
                 try:
                     # Test if the rate is supported
                     test_stream = self.audio.open(
@@ -118,7 +134,9 @@ class AudioManager(QObject):
                 raise RuntimeError("No supported sample rate found")
 
             # Find output device
-            self.output_device_index = find_output_device_index(self.audio)
+            self.output_device_index = find_output_device_index(
+                self.audio, devices=devices
+            )
             if self.output_device_index is None:
                 self.logger.warning("No preferred output device found, using default")
 
@@ -139,6 +157,7 @@ class AudioManager(QObject):
                 raise ValueError("DEEPGRAM_API_KEY not found in environment")
 
             self.deepgram = DeepgramClient(api_key)
+            self.upload_encoder = UploadEncoder()
             self.logger.debug("Deepgram client initialized")
 
         except Exception as e:
@@ -169,9 +188,15 @@ class AudioManager(QObject):
                         break
 
                     frames = []
-                    silence_threshold = 0.01
-                    silence_frames = 0
-                    max_silence_frames = int(self.rate / self.chunk * 1)
+                    vad = EnergyVAD(
+                        self.rate,
+                        dtype=np.float32,
+                        start_threshold=0.02,
+                        stop_threshold=0.01,
+                        hangover_ms=1000,
+                    )
+                    # Keep a little audio from before speech starts
+                    preroll_chunks = max(1, int(self.rate / self.chunk * 0.3))
 
                     while self.is_listening and not self.is_playing:
                         try:
@@ -180,15 +205,16 @@ class AudioManager(QObject):
                             )
                             frames.append(data)
 
-                            if max(abs(float(b)) for b in data) < silence_threshold:
-                                silence_frames += 1
-                            else:
-                                silence_frames = 0
+                            for event in vad.process(data):
+                                if event.type is VADEventType.SPEECH_START:
+                                    self.logger.debug("Speech started")
+                                elif event.type is VADEventType.SPEECH_END:
+                                    self.logger.debug("Speech ended")
+                                    self._process_audio_frames(frames)
+                                    frames = []
 
-                            if silence_frames >= max_silence_frames and frames:
-                                self._process_audio_frames(frames)
-                                frames = []
-                                silence_frames = 0
+                            if not vad.is_speech and len(frames) > preroll_chunks:
+                                del frames[:-preroll_chunks]
 
                         except IOError as e:
                             self.logger.error(f"IO Error in audio capture: {e}")
@@ -204,9 +230,15 @@ class AudioManager(QObject):
     def _process_audio_frames(self, frames):
         """Process captured audio frames with error handling"""
         try:
-            audio_data = b"".join(frames)
+            # Frames are raw float32; upload them compressed (FLAC by default)
+            audio_data = np.frombuffer(b"".join(frames), dtype=np.float32)
+            encoded, mimetype = self.upload_encoder.encode(audio_data, self.rate)
+            self.logger.debug(
+                f"Uploading {len(encoded)} bytes as {mimetype} "
+                f"({audio_data.nbytes} bytes captured)"
+            )
 
-            payload = {"buffer": audio_data}
+            payload = {"buffer": encoded, "mimetype": mimetype}
             options = {
                 "smart_format": True,
                 "model": "nova-2",
@@ -303,43 +335,64 @@ class AudioManager(QObject):
             self.logger.error(f"Error during cleanup: {e}")
 
     def play_audio(self, audio_segment):
-        """Play audio data with error handling and thread safety"""
+        """Play a decoded AudioSegment with error handling and thread safety"""
+        raw_data = memoryview(audio_segment.raw_data)
+        chunk_size = 1024
+        return self.play_stream(
+            (
+                raw_data[offset : offset + chunk_size]
+                for offset in range(0, len(raw_data), chunk_size)
+            ),
+            audio_segment.frame_rate,
+            audio_segment.channels,
+            audio_segment.sample_width,
+        )
+
+    def play_encoded(self, chunks, input_format="mp3"):
+        """Decode compressed audio chunks (e.g. streamed TTS) while playing them"""
+        decoder = StreamingDecoder(input_format=input_format)
+        return self.play_stream(
+            decoder.decode(chunks),
+            decoder.sample_rate,
+            decoder.channels,
+            decoder.sample_width,
+        )
+
+    def play_stream(self, pcm_chunks, sample_rate, channels=1, sample_width=2):
+        """Play PCM chunks as they are produced, opening the stream on the first one"""
         with self._state_lock:
             if self.is_playing:
                 self.logger.debug("Already playing audio, skipping")
                 return False
+            self.is_playing = True
 
-            try:
-                self.logger.debug("Starting audio playback")
-                self.is_playing = True
-
-                raw_data = audio_segment.raw_data
-
-                out_stream = self.audio.open(
-                    format=self.audio.get_format_from_width(audio_segment.sample_width),
-                    channels=audio_segment.channels,
-                    rate=audio_segment.frame_rate,
-                    output=True,
-                    output_device_index=self.output_device_index,
-                )
+        out_stream = None
+        try:
+            self.logger.debug("Starting audio playback")
+            for chunk in pcm_chunks:
+                if not self.is_playing:
+                    break
+                if out_stream is None:
+                    out_stream = self.audio.open(
+                        format=self.audio.get_format_from_width(sample_width),
+                        channels=channels,
+                        rate=sample_rate,
+                        output=True,
+                        output_device_index=self.output_device_index,
+                    )
+                out_stream.write(chunk)
 
-                chunk_size = 1024
-                offset = 0
-                while offset < len(raw_data):
-                    if not self.is_playing:
-                        break
-                    chunk = raw_data[offset : offset + chunk_size]
-                    out_stream.write(chunk)
-                    offset += chunk_size
+            return True
 
+        except Exception as e:
+            self.logger.error(f"Error playing audio: {e}", exc_info=True)
+            self.error_occurred.emit(f"Audio playback error: {str(e)}")
+            return False
+        finally:
+            if out_stream is not None:
                 out_stream.stop_stream()
                 out_stream.close()
-                return True
-
-            except Exception as e:
-                self.logger.error(f"Error playing audio: {e}", exc_info=True)
-                self.error_occurred.emit(f"Audio playback error: {str(e)}")
-                return False
-            finally:
-                self.is_playing = False
-                self.logger.debug("Audio playback complete")
+            if hasattr(pcm_chunks, "close"):
+                pcm_chunks.close()  # Shut down a decoder we stopped early
+            self.is_playing = False
+            self.logger.debug("Audio playback complete")
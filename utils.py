@@ -1,11 +1,39 @@
 import pyaudio
 import logging
+from ai_assistant.utils.device_cache import supports
 
 
-def find_input_device_index(audio):
-    """Find suitable input device with validation"""
+def find_input_device_index(audio, devices=None):
+    """Find suitable input device with validation.
+
+    When `devices` (entries from DeviceCapabilityCache) is given, capabilities
+    are read from it instead of probing each device.
+    """
     logger = logging.getLogger(__name__)
 
+    if devices is not None:
+        for device in devices:
+            if device["max_input_channels"] <= 0:
+                continue
+            supported_rates = [
+                rate
+                for rate in [8000, 16000, 44100, 48000]
+                if supports(device, "input", rate, "float32")
+            ]
+            if supported_rates:
+                logger.info(
+                    f"Device {device['index']} ({device['name']}) supports rates: {supported_rates} (cached)"
+                )
+                return device["index"]
+        for device in devices:
+            if device["max_input_channels"] > 0:
+                logger.info(
+                    f"Using fallback device {device['index']}: {device['name']}"
+                )
+                return device["index"]
+        logger.error("No working input device found")
+        return None
+
     try:
         # First, try to find a device that explicitly supports our needs
         for i in range(audio.get_device_count()):
@@ -62,7 +90,30 @@ def find_input_device_index(audio):
         return None
 
 
-def find_output_device_index(p, preferred_device_name="", verbose=False):
+def _find_cached_output_device(devices, preferred_device_name=""):
+    """Pick an output device from DeviceCapabilityCache entries"""
+    candidates = [
+        dev
+        for dev in devices
+        if dev["max_output_channels"] > 0
+        and "(hw:" in dev["name"]
+        and supports(dev, "output", 44100, "int16")
+    ]
+    if preferred_device_name:
+        for dev in candidates:
+            if preferred_device_name.lower() in dev["name"].lower():
+                print(f"Found output device: {dev['name']}")
+                return dev["index"]
+    if candidates:
+        print(f"Found output device: {candidates[0]['name']}")
+        return candidates[0]["index"]
+    return None
+
+
+def find_output_device_index(p, preferred_device_name="", verbose=False, devices=None):
+    if devices is not None:
+        return _find_cached_output_device(devices, preferred_device_name)
+
     if verbose:
         print(f"Listing output devices:")
         for i in range(p.get_device_count()):